@@ -9,6 +9,7 @@ using the Agent 365 SDK.
 Modules:
     - config: Configuration and environment management
     - auth: Authentication utilities and token management
+    - chat: Shared Azure OpenAI chat client pool
     - observability: Telemetry and tracing setup
     - notifications: Notification handlers (email, Word, Excel, PowerPoint, lifecycle)
     - mcp: MCP (Model Context Protocol) server integration
@@ -18,11 +19,28 @@ Modules:
 Usage:
     from a365_agent import AgentBase, create_and_run_host
     from a365_agent.config import Settings
+
+Exports are resolved lazily (PEP 562), so importing a submodule such as
+``a365_agent.observability`` doesn't also load the host, the proactive
+scheduler, or their SDKs.
 """
 
-from a365_agent.base import AgentBase
-from a365_agent.host import GenericAgentHost, create_and_run_host
-from a365_agent.proactive import ProactiveScheduler, ProactiveTokenProvider
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from a365_agent.base import AgentBase
+    from a365_agent.host import GenericAgentHost, create_and_run_host
+    from a365_agent.proactive import ProactiveScheduler, ProactiveTokenProvider
+
+# Exported name -> (module, attribute)
+_LAZY = {
+    "AgentBase": ("a365_agent.base", "AgentBase"),
+    "GenericAgentHost": ("a365_agent.host", "GenericAgentHost"),
+    "create_and_run_host": ("a365_agent.host", "create_and_run_host"),
+    "ProactiveScheduler": ("a365_agent.proactive.scheduler", "ProactiveScheduler"),
+    "ProactiveTokenProvider": ("a365_agent.proactive.auth", "ProactiveTokenProvider"),
+}
 
 __all__ = [
     "AgentBase",
@@ -33,3 +51,18 @@ __all__ = [
 ]
 
 __version__ = "0.1.0"
+
+
+def __getattr__(name: str) -> Any:
+    """Import an exported name on first access and cache it on the package."""
+    try:
+        module_name, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
@@ -6,11 +6,20 @@ Authentication Module
 Token management, caching, and authentication utilities for A365 agents.
 """
 
+import asyncio
+import functools
+import heapq
 import logging
+import os
+import threading
+import time
+from collections import OrderedDict
 from dataclasses import dataclass
 from typing import Optional
 
-from azure.identity import ClientSecretCredential
+from azure.core.credentials import AccessToken, TokenCredential
+from azure.identity import AzureCliCredential, ClientSecretCredential
+from azure.identity.aio import ClientSecretCredential as AioClientSecretCredential
 
 from a365_agent.config import get_settings
 
@@ -21,34 +30,91 @@ logger = logging.getLogger(__name__)
 # TOKEN CACHE
 # =============================================================================
 
+# Tokens are treated as expired this many seconds before their real expiry
+_EXPIRY_SKEW_SECONDS = 300
+
+# Lifetime assumed for tokens cached without an explicit expiry
+_DEFAULT_TOKEN_TTL_SECONDS = 3600 - 15
+
+
 class TokenCache:
     """
     Thread-safe token cache for Agent 365 Observability and other services.
     
-    Tokens are keyed by tenant_id:agent_id combination.
+    Tokens are keyed by tenant_id:agent_id combination and stored with their
+    expiry (epoch seconds). Entries inside the refresh skew window are
+    treated as missing so callers never receive a token about to expire.
+    
+    The cache is bounded: once it holds more than ``maxsize`` entries the
+    least recently used one is evicted (size via TOKEN_CACHE_MAX_SIZE).
+    Expired entries are swept from a min-heap of expiries on every
+    ``get``/``set``, so memory is released without a background thread.
     """
     
-    def __init__(self):
-        self._cache: dict[str, str] = {}
+    __slots__ = ("maxsize", "_cache", "_exp_heap", "_lock")
+    
+    def __init__(self, maxsize: Optional[int] = None) -> None:
+        self.maxsize: int = maxsize or int(os.getenv("TOKEN_CACHE_MAX_SIZE", "1024"))
+        self._cache: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._exp_heap: list[tuple[float, str]] = []
+        self._lock: threading.Lock = threading.Lock()
     
-    def _make_key(self, tenant_id: str, agent_id: str) -> str:
-        """Create a cache key from tenant and agent IDs."""
-        return f"{tenant_id}:{agent_id}"
+    def _sweep(self, now: float) -> None:
+        """Drop expired entries. Caller must hold ``_lock``."""
+        while self._exp_heap and self._exp_heap[0][0] - _EXPIRY_SKEW_SECONDS <= now:
+            expires_on, key = heapq.heappop(self._exp_heap)
+            entry = self._cache.get(key)
+            # Skip stale heap entries left behind by overwrites
+            if entry is not None and entry[1] == expires_on:
+                del self._cache[key]
     
-    def set(self, tenant_id: str, agent_id: str, token: str) -> None:
-        """Cache a token for the given tenant and agent."""
-        key = self._make_key(tenant_id, agent_id)
-        self._cache[key] = token
-        logger.debug(f"Cached token for {key}")
+    def set(
+        self,
+        tenant_id: str,
+        agent_id: str,
+        token: str,
+        expires_on: Optional[float] = None,
+    ) -> None:
+        """Cache a token for the given tenant and agent.
+        
+        Args:
+            expires_on: Expiry as epoch seconds (e.g. ``AccessToken.expires_on``).
+                        Defaults to a conservative ~1 hour lifetime.
+        """
+        key = f"{tenant_id}:{agent_id}"
+        now = time.time()
+        if expires_on is None:
+            expires_on = now + _DEFAULT_TOKEN_TTL_SECONDS
+        with self._lock:
+            self._sweep(now)
+            previous = self._cache.get(key)
+            self._cache[key] = (token, expires_on)
+            # Re-caching with the same expiry reuses the existing heap entry
+            if previous is None or previous[1] != expires_on:
+                heapq.heappush(self._exp_heap, (expires_on, key))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+            # Overwrites and evictions leave stale heap entries behind; rebuild
+            # from the live entries once they outnumber them
+            if len(self._exp_heap) > 2 * len(self._cache):
+                self._exp_heap = [(exp, k) for k, (_, exp) in self._cache.items()]
+                heapq.heapify(self._exp_heap)
+        logger.debug("Cached token for %s", key)
     
     def get(self, tenant_id: str, agent_id: str) -> Optional[str]:
-        """Retrieve a cached token, or None if not found."""
-        key = self._make_key(tenant_id, agent_id)
-        token = self._cache.get(key)
-        if token:
-            logger.debug(f"Token cache hit for {key}")
-        else:
-            logger.debug(f"Token cache miss for {key}")
+        """Retrieve a cached token, or None if not found or about to expire."""
+        key = f"{tenant_id}:{agent_id}"
+        with self._lock:
+            self._sweep(time.time())
+            entry = self._cache.get(key)
+            if entry is None:
+                logger.debug("Token cache miss for %s", key)
+                return None
+            
+            token, _ = entry
+            self._cache.move_to_end(key)
+        logger.debug("Token cache hit for %s", key)
         return token
     
     def clear(self, tenant_id: Optional[str] = None, agent_id: Optional[str] = None) -> None:
@@ -58,33 +124,95 @@ class TokenCache:
         Otherwise clears all tokens.
         """
         if tenant_id and agent_id:
-            key = self._make_key(tenant_id, agent_id)
-            self._cache.pop(key, None)
-            logger.debug(f"Cleared token for {key}")
+            key = f"{tenant_id}:{agent_id}"
+            with self._lock:
+                self._cache.pop(key, None)
+            logger.debug("Cleared token for %s", key)
         else:
-            self._cache.clear()
+            with self._lock:
+                self._cache.clear()
+                self._exp_heap.clear()
             logger.debug("Cleared all tokens from cache")
 
 
 # Global token cache instance
 _token_cache = TokenCache()
 
+# Client-credential tokens, keyed by tenant and requested scopes
+_client_credential_token_cache = TokenCache()
 
-def cache_agentic_token(tenant_id: str, agent_id: str, token: str) -> None:
-    """Cache an agentic token for observability."""
-    _token_cache.set(tenant_id, agent_id, token)
 
+# Agentic tokens for observability. Bound methods rather than wrapper
+# functions so each lookup costs a single call:
+#   cache_agentic_token(tenant_id, agent_id, token, expires_on=None)
+#   get_cached_agentic_token(tenant_id, agent_id) -> Optional[str]
+cache_agentic_token = _token_cache.set
+get_cached_agentic_token = _token_cache.get
 
-def get_cached_agentic_token(tenant_id: str, agent_id: str) -> Optional[str]:
-    """Get a cached agentic token."""
-    return _token_cache.get(tenant_id, agent_id)
+
+# =============================================================================
+# CACHING TOKEN CREDENTIAL
+# =============================================================================
+
+class CachingTokenCredential:
+    """
+    Wraps a sync ``TokenCredential`` and reuses its tokens until shortly
+    before they expire.
+    
+    ``AzureCliCredential`` runs an ``az`` subprocess on every ``get_token``
+    call; behind this wrapper that happens once per token lifetime per set
+    of scopes. Requests with extra options (claims, tenant_id, ...) are
+    passed straight through.
+    """
+    
+    __slots__ = ("_credential", "_tokens", "_lock")
+    
+    def __init__(self, credential: TokenCredential) -> None:
+        self._credential = credential
+        self._tokens: dict[tuple[str, ...], AccessToken] = {}
+        self._lock: threading.Lock = threading.Lock()
+    
+    def _fresh(self, scopes: tuple[str, ...]) -> Optional[AccessToken]:
+        """The cached token for ``scopes`` unless it is about to expire."""
+        token = self._tokens.get(scopes)
+        if token is not None and token.expires_on - time.time() > _EXPIRY_SKEW_SECONDS:
+            return token
+        return None
+    
+    def get_token(self, *scopes: str, **kwargs) -> AccessToken:
+        """Return a cached token for ``scopes``, refreshing it when near expiry."""
+        if kwargs:
+            return self._credential.get_token(*scopes, **kwargs)
+        
+        token = self._fresh(scopes)
+        if token is not None:
+            return token
+        
+        # One refresh at a time; threads that waited reuse the fresh token
+        with self._lock:
+            token = self._fresh(scopes)
+            if token is None:
+                token = self._credential.get_token(*scopes)
+                self._tokens[scopes] = token
+                logger.debug("Refreshed credential token for %s", " ".join(scopes))
+        return token
+    
+    def close(self) -> None:
+        """Close the wrapped credential."""
+        self._credential.close()
+
+
+@functools.lru_cache(maxsize=1)
+def get_cli_credential() -> CachingTokenCredential:
+    """Shared Azure CLI credential with token caching (for keyless Azure OpenAI)."""
+    return CachingTokenCredential(AzureCliCredential())
 
 
 # =============================================================================
 # LOCAL AUTHENTICATION OPTIONS
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class LocalAuthOptions:
     """
     Authentication options for local/development scenarios.
@@ -95,13 +223,6 @@ class LocalAuthOptions:
     env_id: str = ""
     bearer_token: str = ""
     
-    def __post_init__(self):
-        """Ensure string types."""
-        if not isinstance(self.env_id, str):
-            self.env_id = str(self.env_id) if self.env_id else ""
-        if not isinstance(self.bearer_token, str):
-            self.bearer_token = str(self.bearer_token) if self.bearer_token else ""
-    
     @property
     def is_valid(self) -> bool:
         """Check if auth options are valid."""
@@ -111,10 +232,9 @@ class LocalAuthOptions:
     def from_environment(cls) -> "LocalAuthOptions":
         """Create from environment variables."""
         settings = get_settings()
-        import os
         return cls(
-            env_id=os.getenv("ENV_ID", ""),
-            bearer_token=settings.bearer_token
+            env_id=os.getenv("ENV_ID") or "",
+            bearer_token=settings.bearer_token or "",
         )
 
 
@@ -122,27 +242,132 @@ class LocalAuthOptions:
 # CLIENT CREDENTIALS
 # =============================================================================
 
+# Sync credential, kept so its MSAL token cache is reused and rebuilt if
+# credentials change; replaced ones are closed on shutdown (see the async
+# credential below)
+_credential: Optional[ClientSecretCredential] = None
+_credential_key: Optional[tuple[str, str, str]] = None
+_retired_credentials: list[ClientSecretCredential] = []
+
+
 def get_client_credential() -> Optional[ClientSecretCredential]:
     """
     Get a ClientSecretCredential for the agent's service connection.
     
-    Returns None if client credentials are not configured.
+    Returns None if client credentials are not configured. The same
+    instance is returned for as long as the configured credentials
+    stay the same.
     
     NOTE: Agentic applications cannot use client credentials to acquire
     tokens for MCP or Bot Framework resources (AADSTS82001 error).
     This is only useful for non-agentic scenarios.
     """
+    global _credential, _credential_key
+    settings = get_settings()
+    
+    if not settings.agent_auth.is_valid:
+        logger.debug("Client credentials not configured")
+        return None
+    
+    key = (
+        settings.agent_auth.tenant_id,
+        settings.agent_auth.client_id,
+        settings.agent_auth.client_secret,
+    )
+    if _credential is None or _credential_key != key:
+        if _credential is not None:
+            _retired_credentials.append(_credential)
+        _credential = ClientSecretCredential(
+            tenant_id=key[0],
+            client_id=key[1],
+            client_secret=key[2],
+        )
+        _credential_key = key
+    return _credential
+
+
+# Async credential shared by all token requests, rebuilt if credentials change
+_aio_credential: Optional[AioClientSecretCredential] = None
+_aio_credential_key: Optional[tuple[str, str, str]] = None
+
+# Credentials replaced by a rebuild. Requests may still be awaiting them, so
+# they are closed on shutdown rather than when replaced.
+_retired_aio_credentials: list[AioClientSecretCredential] = []
+
+
+def get_aio_client_credential() -> Optional[AioClientSecretCredential]:
+    """
+    Get the async ClientSecretCredential for the agent's service connection.
+    
+    Same as ``get_client_credential`` but non-blocking, for use on the
+    event loop. Returns None if client credentials are not configured.
+    """
+    global _aio_credential, _aio_credential_key
     settings = get_settings()
     
     if not settings.agent_auth.is_valid:
         logger.debug("Client credentials not configured")
         return None
     
-    return ClientSecretCredential(
-        tenant_id=settings.agent_auth.tenant_id,
-        client_id=settings.agent_auth.client_id,
-        client_secret=settings.agent_auth.client_secret,
+    key = (
+        settings.agent_auth.tenant_id,
+        settings.agent_auth.client_id,
+        settings.agent_auth.client_secret,
     )
+    if _aio_credential is None or _aio_credential_key != key:
+        if _aio_credential is not None:
+            _retired_aio_credentials.append(_aio_credential)
+        _aio_credential = AioClientSecretCredential(
+            tenant_id=key[0],
+            client_id=key[1],
+            client_secret=key[2],
+        )
+        _aio_credential_key = key
+    return _aio_credential
+
+
+async def close_client_credentials() -> None:
+    """Close the shared client credentials and any they replaced (call on shutdown)."""
+    global _credential, _credential_key, _aio_credential, _aio_credential_key
+    while _retired_credentials:
+        _retired_credentials.pop().close()
+    if _credential is not None:
+        _credential.close()
+        _credential = None
+        _credential_key = None
+    while _retired_aio_credentials:
+        await _retired_aio_credentials.pop().close()
+    if _aio_credential is not None:
+        await _aio_credential.close()
+        _aio_credential = None
+        _aio_credential_key = None
+
+
+# In-flight client-credential requests, keyed by (tenant_id, scopes). Checking
+# and registering a task happens without an await in between, so no lock is
+# needed on the single-threaded event loop.
+_inflight_token_requests: dict[tuple[str, str], "asyncio.Task[Optional[str]]"] = {}
+
+
+async def _fetch_client_credential_token(
+    credential: AioClientSecretCredential,
+    tenant_id: str,
+    scopes: list[str],
+) -> Optional[str]:
+    """Request a token from AAD and cache it until its real expiry."""
+    scope_key = " ".join(scopes)
+    try:
+        token = await credential.get_token(*scopes)
+        _client_credential_token_cache.set(
+            tenant_id, scope_key, token.token, token.expires_on
+        )
+        logger.info("Successfully acquired token with client credentials")
+        return token.token
+    except Exception as e:
+        logger.warning("Failed to acquire token with client credentials: %s", e)
+        return None
+    finally:
+        _inflight_token_requests.pop((tenant_id, scope_key), None)
 
 
 async def acquire_token_with_client_credentials(scopes: list[str]) -> Optional[str]:
@@ -155,16 +380,53 @@ async def acquire_token_with_client_credentials(scopes: list[str]) -> Optional[s
     Returns:
         The access token, or None if acquisition failed
         
+    Concurrent calls for the same scopes share a single AAD request.
+        
     NOTE: This will fail for agentic apps trying to access MCP or Bot Framework.
     """
-    credential = get_client_credential()
+    credential = get_aio_client_credential()
     if not credential:
         return None
     
-    try:
-        token = credential.get_token(*scopes)
-        logger.info("Successfully acquired token with client credentials")
-        return token.token
-    except Exception as e:
-        logger.warning(f"Failed to acquire token with client credentials: {e}")
-        return None
+    tenant_id = get_settings().agent_auth.tenant_id
+    scope_key = " ".join(scopes)
+    cached = _client_credential_token_cache.get(tenant_id, scope_key)
+    if cached:
+        return cached
+    
+    key = (tenant_id, scope_key)
+    task = _inflight_token_requests.get(key)
+    if task is None:
+        task = asyncio.create_task(
+            _fetch_client_credential_token(credential, tenant_id, list(scopes))
+        )
+        _inflight_token_requests[key] = task
+    
+    # Shielded so one caller being cancelled doesn't fail the others
+    return await asyncio.shield(task)
+
+
+async def acquire_tokens_batch(
+    scope_lists: list[list[str]],
+    concurrency: int = 16,
+) -> list[Optional[str]]:
+    """
+    Acquire client-credential tokens for several scope sets in parallel.
+    
+    Requests share the async credential and the token cache, with at most
+    ``concurrency`` AAD calls in flight at a time.
+    
+    Args:
+        scope_lists: One list of scopes per token to acquire
+        concurrency: Maximum number of concurrent token requests
+        
+    Returns:
+        Tokens in the same order as ``scope_lists`` (None where acquisition failed)
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def _acquire(scopes: list[str]) -> Optional[str]:
+        async with semaphore:
+            return await acquire_token_with_client_credentials(scopes)
+    
+    return await asyncio.gather(*(_acquire(scopes) for scopes in scope_lists))
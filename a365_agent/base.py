@@ -7,11 +7,15 @@ Defines the abstract base class that all agents must inherit from
 to work with the GenericAgentHost.
 """
 
+import functools
+import logging
 from abc import ABC, abstractmethod
 from typing import Optional
 
 from microsoft_agents.hosting.core import Authorization, TurnContext
 
+logger = logging.getLogger(__name__)
+
 
 class AgentBase(ABC):
     """
@@ -61,7 +65,8 @@ class AgentBase(ABC):
             context: The TurnContext for the current conversation
             
         Returns:
-            The agent's response text
+            The agent's response text, or an empty string if the agent
+            already delivered it (e.g. streamed through the TurnContext)
         """
         pass
 
@@ -161,6 +166,12 @@ class AgentBase(ABC):
         return "Lifecycle notification received."
 
 
+@functools.lru_cache(maxsize=None)
+def _is_agent_subclass(agent_class: type) -> bool:
+    """Memoized ``issubclass`` check against AgentBase."""
+    return issubclass(agent_class, AgentBase)
+
+
 def check_agent_inheritance(agent_class: type) -> bool:
     """
     Verify that an agent class inherits from AgentBase.
@@ -171,7 +182,7 @@ def check_agent_inheritance(agent_class: type) -> bool:
     Returns:
         True if the class inherits from AgentBase, False otherwise
     """
-    if not issubclass(agent_class, AgentBase):
-        print(f"❌ Agent {agent_class.__name__} must inherit from AgentBase")
+    if not _is_agent_subclass(agent_class):
+        logger.error(f"❌ Agent {agent_class.__name__} must inherit from AgentBase")
         return False
     return True
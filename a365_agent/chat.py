@@ -0,0 +1,58 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""
+Chat Client Module
+
+Process-wide pool of Azure OpenAI chat clients, shared by the interactive
+agents and the proactive scheduler.
+"""
+
+import threading
+from typing import TYPE_CHECKING
+
+from a365_agent.auth import get_cli_credential
+from a365_agent.config import AzureOpenAIModelConfig
+
+if TYPE_CHECKING:
+    from agent_framework.azure import AzureOpenAIChatClient
+
+
+# =============================================================================
+# CHAT CLIENT POOL
+# =============================================================================
+
+# Keyed by (endpoint, deployment, api_version), so failover back to a model,
+# additional agents and cron ticks reuse its HTTP connection pool and credential
+_chat_clients: dict[tuple[str, str, str], "AzureOpenAIChatClient"] = {}
+_chat_clients_lock = threading.Lock()
+
+
+def get_chat_client(model: AzureOpenAIModelConfig) -> "AzureOpenAIChatClient":
+    """Return the shared chat client for a model deployment, creating it once."""
+    key = (model.endpoint, model.deployment, model.api_version)
+    client = _chat_clients.get(key)
+    if client is not None:
+        return client
+    
+    # Imported here: agent_framework.azure pulls in the OpenAI and Azure
+    # SDKs, which importing this module (e.g. for discovery) doesn't need
+    from agent_framework.azure import AzureOpenAIChatClient
+    
+    with _chat_clients_lock:
+        client = _chat_clients.get(key)
+        if client is None:
+            # API key authentication, or the Azure CLI login when no key is
+            # set (its tokens are cached, so az isn't spawned on every request)
+            if model.api_key:
+                client_auth = {"api_key": model.api_key}
+            else:
+                client_auth = {"credential": get_cli_credential()}
+            
+            client = AzureOpenAIChatClient(
+                endpoint=model.endpoint,
+                deployment_name=model.deployment,
+                api_version=model.api_version,
+                **client_auth,
+            )
+            _chat_clients[key] = client
+    return client
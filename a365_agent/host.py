@@ -15,6 +15,7 @@ Platform Limitations (Agentic Auth):
 
 import asyncio
 import logging
+import re
 import socket
 import uuid
 import os
@@ -24,9 +25,10 @@ from typing import Optional, Type
 from aiohttp.web import Application, Request, Response, json_response, run_app
 from aiohttp.web_middlewares import middleware as web_middleware
 
-from a365_agent.auth import cache_agentic_token
+from a365_agent.auth import cache_agentic_token, close_client_credentials
 from a365_agent.base import AgentBase, check_agent_inheritance
 from a365_agent.config import get_settings
+from a365_agent.mcp import preload as preload_mcp
 from a365_agent.notifications import (
     NotificationHandlerMixin,
     safe_send_activity,
@@ -69,6 +71,16 @@ logger = logging.getLogger(__name__)
 # Load agents SDK configuration
 _agents_sdk_config = load_configuration_from_env(environ)
 
+# Teams roster/system events delivered as message text (e.g. "<addmember>...",
+# possibly HTML-wrapped as "<p><addmember>..."): markup that contains one of
+# the event tags anywhere. Anchored and compiled once, so a normal message
+# costs a single failed match at its first non-space character and none of
+# these ever reach the LLM.
+_TEAMS_SYSTEM_MESSAGE = re.compile(
+    r"\A\s*(?=<)(?=.*?<(?:addmember|removemember|topicupdate|historyupdate)>)",
+    re.IGNORECASE | re.DOTALL,
+)
+
 
 def create_and_run_host(
     agent_class: Type[AgentBase],
@@ -214,7 +226,7 @@ class GenericAgentHost(NotificationHandlerMixin):
                 logger.warning("⚠️ Token exchange returned no token")
                 
         except Exception as e:
-            logger.warning(f"⚠️ Failed to cache observability token: {e}")
+            logger.warning("⚠️ Failed to cache observability token: %s", e)
     
     async def _validate_and_setup_context(
         self,
@@ -311,17 +323,17 @@ class GenericAgentHost(NotificationHandlerMixin):
                                 context,
                             )
                             if response and response.strip():
-                                logger.info(f"📧 Email handled via MCP: {response[:80]}...")
+                                logger.info("📧 Email handled via MCP: %s...", response[:80])
                             else:
                                 logger.info("📧 No response needed (system notification ignored)")
                         except Exception as e:
-                            logger.error(f"❌ Background email processing error: {e}")
+                            logger.error("❌ Background email processing error: %s", e)
                     
                     asyncio.create_task(_process_email_background())
                     logger.info("📧 Email processing started in background (agent will reply via MCP)")
                     
             except Exception as e:
-                logger.error(f"❌ Email notification error: {e}")
+                logger.error("❌ Email notification error: %s", e)
     
     def _register_word_handler(self, handler_config: dict) -> None:
         """Register Word notification handler."""
@@ -345,22 +357,22 @@ class GenericAgentHost(NotificationHandlerMixin):
                         await safe_send_activity(context, "This agent doesn't support Word notifications.")
                         return
                     
-                    try:
-                        async with asyncio.timeout(self.DOC_NOTIFICATION_TIMEOUT):
-                            response = await self.agent_instance.handle_word_notification(
-                                notification_activity,
-                                self.agent_app.auth,
-                                self.auth_handler_name,
-                                context,
-                            )
-                    except asyncio.TimeoutError:
-                        logger.warning(f"⚠️ Word timeout after {self.DOC_NOTIFICATION_TIMEOUT}s")
-                        response = "Thank you for your comment. I'm still processing."
-                    
-                    await safe_send_activity(context, response)
+                    response = await self.run_with_timeout(
+                        self.agent_instance.handle_word_notification(
+                            notification_activity,
+                            self.agent_app.auth,
+                            self.auth_handler_name,
+                            context,
+                        ),
+                        self.DOC_NOTIFICATION_TIMEOUT,
+                        context,
+                        "Word",
+                    )
+                    if response is not None:
+                        await safe_send_activity(context, response)
                     
             except Exception as e:
-                logger.error(f"❌ Word notification error: {e}")
+                logger.error("❌ Word notification error: %s", e)
                 await safe_send_activity(context, "Thank you for your comment. I encountered an issue.")
     
     def _register_excel_handler(self, handler_config: dict) -> None:
@@ -385,22 +397,22 @@ class GenericAgentHost(NotificationHandlerMixin):
                         await safe_send_activity(context, "This agent doesn't support Excel notifications.")
                         return
                     
-                    try:
-                        async with asyncio.timeout(self.DOC_NOTIFICATION_TIMEOUT):
-                            response = await self.agent_instance.handle_excel_notification(
-                                notification_activity,
-                                self.agent_app.auth,
-                                self.auth_handler_name,
-                                context,
-                            )
-                    except asyncio.TimeoutError:
-                        logger.warning(f"⚠️ Excel timeout after {self.DOC_NOTIFICATION_TIMEOUT}s")
-                        response = "Thank you for your comment. I'm still processing."
-                    
-                    await safe_send_activity(context, response)
+                    response = await self.run_with_timeout(
+                        self.agent_instance.handle_excel_notification(
+                            notification_activity,
+                            self.agent_app.auth,
+                            self.auth_handler_name,
+                            context,
+                        ),
+                        self.DOC_NOTIFICATION_TIMEOUT,
+                        context,
+                        "Excel",
+                    )
+                    if response is not None:
+                        await safe_send_activity(context, response)
                     
             except Exception as e:
-                logger.error(f"❌ Excel notification error: {e}")
+                logger.error("❌ Excel notification error: %s", e)
                 await safe_send_activity(context, "Thank you for your comment. I encountered an issue.")
     
     def _register_powerpoint_handler(self, handler_config: dict) -> None:
@@ -425,22 +437,22 @@ class GenericAgentHost(NotificationHandlerMixin):
                         await safe_send_activity(context, "This agent doesn't support PowerPoint notifications.")
                         return
                     
-                    try:
-                        async with asyncio.timeout(self.DOC_NOTIFICATION_TIMEOUT):
-                            response = await self.agent_instance.handle_powerpoint_notification(
-                                notification_activity,
-                                self.agent_app.auth,
-                                self.auth_handler_name,
-                                context,
-                            )
-                    except asyncio.TimeoutError:
-                        logger.warning(f"⚠️ PowerPoint timeout after {self.DOC_NOTIFICATION_TIMEOUT}s")
-                        response = "Thank you for your comment. I'm still processing."
-                    
-                    await safe_send_activity(context, response)
+                    response = await self.run_with_timeout(
+                        self.agent_instance.handle_powerpoint_notification(
+                            notification_activity,
+                            self.agent_app.auth,
+                            self.auth_handler_name,
+                            context,
+                        ),
+                        self.DOC_NOTIFICATION_TIMEOUT,
+                        context,
+                        "PowerPoint",
+                    )
+                    if response is not None:
+                        await safe_send_activity(context, response)
                     
             except Exception as e:
-                logger.error(f"❌ PowerPoint notification error: {e}")
+                logger.error("❌ PowerPoint notification error: %s", e)
                 await safe_send_activity(context, "Thank you for your comment. I encountered an issue.")
     
     def _register_lifecycle_handler(self, handler_config: dict) -> None:
@@ -468,12 +480,12 @@ class GenericAgentHost(NotificationHandlerMixin):
                             self.auth_handler_name,
                             context,
                         )
-                        logger.info(f"📋 Lifecycle processed: {response}")
+                        logger.info("📋 Lifecycle processed: %s", response)
                     
                     # Lifecycle notifications don't send replies
                     
             except Exception as e:
-                logger.error(f"❌ Lifecycle notification error: {e}")
+                logger.error("❌ Lifecycle notification error: %s", e)
     
     def _register_generic_notification_handler(self, handler_config: dict) -> None:
         """Register fallback handler for unhandled notification types."""
@@ -495,7 +507,7 @@ class GenericAgentHost(NotificationHandlerMixin):
                 
                 with ObservabilityContext(tenant_id, agent_id, correlation_id):
                     notification_type = notification_activity.notification_type
-                    logger.info(f"📬 Generic notification: {notification_type}")
+                    logger.info("📬 Generic notification: %s", notification_type)
                     
                     notification_text = getattr(notification_activity, 'text', None)
                     if notification_text:
@@ -504,7 +516,7 @@ class GenericAgentHost(NotificationHandlerMixin):
                         await context.send_activity(f"Notification of type {notification_type} acknowledged.")
                         
             except Exception as e:
-                logger.error(f"❌ Generic notification error: {e}")
+                logger.error("❌ Generic notification error: %s", e)
     
     def _register_message_handler(self, handler_config: dict) -> None:
         """Register the main message handler."""
@@ -523,14 +535,11 @@ class GenericAgentHost(NotificationHandlerMixin):
                         return
                     
                     # Skip Teams system messages
-                    if user_message.strip().startswith("<") and any(
-                        tag in user_message.lower()
-                        for tag in ["<addmember>", "<removemember>", "<topicupdate>", "<historyupdate>"]
-                    ):
+                    if _TEAMS_SYSTEM_MESSAGE.search(user_message):
                         logger.info("🔇 Ignoring Teams system message")
                         return
                     
-                    logger.info(f"📨 {user_message}")
+                    logger.info("📨 %s", user_message)
                     
                     # Check if MCP needs initialization
                     is_first_request = (
@@ -556,21 +565,23 @@ class GenericAgentHost(NotificationHandlerMixin):
                                 self.auth_handler_name,
                                 context,
                             )
-                            await context.send_activity(response)
+                            # Empty when the agent already streamed its reply
+                            if response:
+                                await context.send_activity(response)
                             logger.info("✅ Response sent")
                             
                             if is_first_request:
                                 logger.info("✅ First request completed - MCP initialized")
                                 
                     except asyncio.TimeoutError:
-                        logger.warning(f"⏳ Request timed out after {timeout}s")
+                        logger.warning("⏳ Request timed out after %ss", timeout)
                         await context.send_activity(
                             "Sorry, your request is taking too long. "
                             "Please try a simpler query."
                         )
                         
             except Exception as e:
-                logger.error(f"❌ Error: {e}")
+                logger.error("❌ Error: %s", e)
                 await context.send_activity(f"Sorry, I encountered an error: {str(e)}")
     
     # =========================================================================
@@ -579,6 +590,9 @@ class GenericAgentHost(NotificationHandlerMixin):
     
     async def initialize_agent(self) -> None:
         """Initialize the agent instance and start the proactive scheduler if enabled."""
+        # Keep the MCP SDK import off the first request's critical path
+        preload_mcp()
+        
         if self.agent_instance is None:
             logger.info(f"🤖 Initializing {self.agent_class.__name__}...")
             self.agent_instance = self.agent_class(*self.agent_args, **self.agent_kwargs)
@@ -609,6 +623,11 @@ class GenericAgentHost(NotificationHandlerMixin):
                 await self.agent_instance.cleanup()
             except Exception as e:
                 logger.error(f"Cleanup error: {e}")
+        
+        try:
+            await close_client_credentials()
+        except Exception as e:
+            logger.error(f"Credential cleanup error: {e}")
     
     # =========================================================================
     # AUTHENTICATION
@@ -7,6 +7,6 @@ Model Context Protocol server integration for A365 agents.
 Handles MCP server initialization and tool registration.
 """
 
-from a365_agent.mcp.service import MCPService
+from a365_agent.mcp.service import MCPService, preload
 
-__all__ = ["MCPService"]
+__all__ = ["MCPService", "preload"]
@@ -13,12 +13,47 @@ Platform Limitations for Agentic Apps:
 
 import asyncio
 import logging
-from typing import Any, Optional
+import os
+import time
+from typing import Any, Awaitable, Callable, Optional
 
 from a365_agent.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# McpToolRegistrationService class, imported on first use or by preload()
+_McpToolRegistrationService: Optional[type] = None
+
+
+def _load_tool_service_class() -> type:
+    """Import the MCP tool registration service class once and cache it."""
+    global _McpToolRegistrationService
+    if _McpToolRegistrationService is None:
+        from microsoft_agents_a365.tooling.extensions.agentframework.services.mcp_tool_registration_service import (
+            McpToolRegistrationService,
+        )
+        _McpToolRegistrationService = McpToolRegistrationService
+    return _McpToolRegistrationService
+
+
+def preload() -> None:
+    """
+    Import the MCP SDK eagerly so the first request doesn't pay for it.
+    
+    Called by the host at startup unless MCP_PRELOAD=false. Import errors
+    are logged and deferred to the first initialization attempt.
+    """
+    if os.getenv("MCP_PRELOAD", "true").lower() != "true":
+        return
+    
+    start = time.monotonic()
+    try:
+        _load_tool_service_class()
+    except ImportError as e:
+        logger.warning("⚠️ MCP SDK preload skipped: %s", e)
+        return
+    logger.info("📦 MCP SDK preloaded in %.1fs", time.monotonic() - start)
+
 
 class MCPService:
     """
@@ -41,6 +76,16 @@ class MCPService:
         self._tool_service = None
         self._initialized = False
         self._init_error: Optional[str] = None
+        # Agent returned by the live session's initialization
+        self._agent: Any = None
+        
+        # Single-flight initialization (see _ensure_initialized). The task
+        # owns the SDK session: it initializes it, then waits for
+        # _close_event and tears it down itself
+        self._init_lock = asyncio.Lock()
+        self._init_task: Optional[asyncio.Task] = None
+        self._init_result: Optional[asyncio.Future] = None
+        self._close_event: Optional[asyncio.Event] = None
     
     @property
     def is_initialized(self) -> bool:
@@ -56,19 +101,131 @@ class MCPService:
         """Get or create the MCP tool registration service."""
         if self._tool_service is None:
             try:
-                from microsoft_agents_a365.tooling.extensions.agentframework.services.mcp_tool_registration_service import (
-                    McpToolRegistrationService,
-                )
-                self._tool_service = McpToolRegistrationService()
+                self._tool_service = _load_tool_service_class()()
                 logger.info("✅ MCP tool service created")
             except ImportError as e:
-                logger.error(f"❌ MCP SDK not available: {e}")
+                logger.error("❌ MCP SDK not available: %s", e)
                 raise
             except Exception as e:
-                logger.error(f"❌ Failed to create MCP tool service: {e}")
+                logger.error("❌ Failed to create MCP tool service: %s", e)
                 raise
         return self._tool_service
     
+    def warm_up(self) -> None:
+        """
+        Create the tool registration service ahead of the first request.
+        
+        Registering the tool servers needs a user token (see the class
+        docstring), but building the service does not, so this can run at
+        startup. Failures are logged and surface again on the first
+        initialization attempt.
+        """
+        if self._initialized:
+            return
+        try:
+            self._get_tool_service()
+        except Exception:
+            pass  # Already logged by _get_tool_service
+    
+    async def _ensure_initialized(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        mode: str,
+    ) -> Any:
+        """
+        Run MCP initialization exactly once, however many callers race here.
+        
+        The first caller starts ``factory()`` in a session task of its own
+        (``_run_session``), not in the caller's task: the SDK session must be
+        closed by the task that opened it, and that task outlives the request.
+        Concurrent and later callers don't register the tool servers again;
+        they get the same agent, built from the first caller's
+        ``turn_context`` and auth. The wait is shielded so a caller that
+        times out or is cancelled does not abort initialization for everyone
+        else. A failed attempt clears the task so the next caller retries.
+        
+        Args:
+            factory: Coroutine function performing the actual SDK call
+            mode: Human-readable auth mode for logging
+            
+        Returns:
+            The agent with MCP tools registered (the same object for every
+            caller until ``cleanup()``)
+        """
+        # Hot path: the flag only ever flips False -> True (and back only in
+        # cleanup), so a plain read is safe without taking the lock.
+        if self._initialized:
+            return self._agent
+        
+        async with self._init_lock:
+            if self._initialized:
+                logger.info("✅ MCP servers already initialized")
+                return self._agent
+            if self._init_task is None:
+                self._init_result = asyncio.get_running_loop().create_future()
+                # Mark a failure retrieved even if every caller gave up waiting
+                self._init_result.add_done_callback(
+                    lambda f: f.cancelled() or f.exception()
+                )
+                self._close_event = asyncio.Event()
+                self._init_task = asyncio.create_task(
+                    self._run_session(factory, mode, self._init_result, self._close_event)
+                )
+            init_result = self._init_result
+        
+        return await asyncio.shield(init_result)
+    
+    async def _run_session(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        mode: str,
+        result: asyncio.Future,
+        close_event: asyncio.Event,
+    ) -> None:
+        """
+        Own one MCP session from initialization to teardown.
+        
+        The SDK's transports are anyio cancel scopes, which must be exited by
+        the task that entered them, so the tool servers are registered and
+        cleaned up here rather than in whichever task calls ``cleanup()``.
+        """
+        logger.info("🚀 Initializing MCP servers with %s...", mode)
+        init_start = time.monotonic()
+        
+        tool_service = None
+        try:
+            try:
+                # The same instance factory() registers the servers on
+                tool_service = self._get_tool_service()
+                agent = await factory()
+            except BaseException as e:
+                # cleanup() may already have dropped this task (and a retry
+                # started another), so only clear the slot if it is still ours
+                if self._init_task is asyncio.current_task():
+                    self._init_task = None
+                if isinstance(e, asyncio.CancelledError):
+                    result.cancel()
+                else:
+                    self._init_error = str(e)
+                    logger.error("❌ MCP initialization failed: %s", e)
+                    result.set_exception(e)
+                return
+            
+            init_duration = time.monotonic() - init_start
+            # Publish before any waiter wakes up so late callers take the hot path
+            self._agent = agent
+            self._initialized = True
+            self._init_error = None
+            logger.info("✅ MCP initialization completed in %.1fs", init_duration)
+            result.set_result(agent)
+            
+            await close_event.wait()
+        finally:
+            if tool_service is not None:
+                if self._tool_service is tool_service:
+                    self._tool_service = None
+                await self._close_tool_service(tool_service)
+    
     async def initialize_with_bearer_token(
         self,
         chat_client: Any,
@@ -95,16 +252,10 @@ class MCPService:
             initial_tools: Optional list of initial tools
             
         Returns:
-            The agent with MCP tools registered
+            The agent with MCP tools registered (shared by every caller until
+            ``cleanup()``, see ``_ensure_initialized``)
         """
-        if self._initialized:
-            logger.info("✅ MCP servers already initialized")
-            return None
-        
-        logger.info("🚀 Initializing MCP servers with bearer token...")
-        init_start = asyncio.get_event_loop().time()
-        
-        try:
+        async def _init() -> Any:
             tool_service = self._get_tool_service()
             
             # Build kwargs for SDK call - all params are now required
@@ -118,18 +269,9 @@ class MCPService:
                 "turn_context": turn_context,
             }
             
-            agent = await tool_service.add_tool_servers_to_agent(**sdk_kwargs)
-            
-            init_duration = asyncio.get_event_loop().time() - init_start
-            self._initialized = True
-            logger.info(f"✅ MCP initialization completed in {init_duration:.1f}s")
-            
-            return agent
-            
-        except Exception as e:
-            self._init_error = str(e)
-            logger.error(f"❌ MCP initialization failed: {e}")
-            raise
+            return await tool_service.add_tool_servers_to_agent(**sdk_kwargs)
+        
+        return await self._ensure_initialized(_init, "bearer token")
     
     async def initialize_with_agentic_auth(
         self,
@@ -156,19 +298,13 @@ class MCPService:
             initial_tools: Optional list of initial tools
             
         Returns:
-            The agent with MCP tools registered
+            The agent with MCP tools registered (shared by every caller until
+            ``cleanup()``, see ``_ensure_initialized``)
         """
-        if self._initialized:
-            logger.info("✅ MCP servers already initialized")
-            return None
-        
-        logger.info("🚀 Initializing MCP servers with agentic token exchange...")
-        init_start = asyncio.get_event_loop().time()
-        
-        try:
+        async def _init() -> Any:
             tool_service = self._get_tool_service()
             
-            agent = await tool_service.add_tool_servers_to_agent(
+            return await tool_service.add_tool_servers_to_agent(
                 chat_client=chat_client,
                 agent_instructions=agent_instructions,
                 initial_tools=initial_tools or [],
@@ -177,17 +313,8 @@ class MCPService:
                 turn_context=turn_context,
                 # No auth_token - SDK will do agentic token exchange
             )
-            
-            init_duration = asyncio.get_event_loop().time() - init_start
-            self._initialized = True
-            logger.info(f"✅ MCP initialization completed in {init_duration:.1f}s")
-            
-            return agent
-            
-        except Exception as e:
-            self._init_error = str(e)
-            logger.error(f"❌ MCP initialization failed: {e}")
-            raise
+        
+        return await self._ensure_initialized(_init, "agentic token exchange")
     
     def ensure_ready(self) -> None:
         """
@@ -201,13 +328,34 @@ class MCPService:
             raise RuntimeError(f"MCP not ready: {error_msg}")
     
     async def cleanup(self) -> None:
-        """Clean up MCP service resources."""
-        if self._tool_service:
-            try:
-                await self._tool_service.cleanup()
-                logger.info("✅ MCP service cleaned up")
-            except Exception as e:
-                logger.error(f"❌ MCP cleanup error: {e}")
+        """
+        Clean up MCP service resources.
         
+        Safe to call from any task: the session's owning task (see
+        ``_run_session``) is told to close it, or cancelled if it is still
+        initializing, and this waits for it to finish.
+        """
+        session_task, self._init_task = self._init_task, None
+        # Detached now so a new session started meanwhile gets its own
+        tool_service, self._tool_service = self._tool_service, None
         self._initialized = False
-        self._tool_service = None
+        self._agent = None
+        if session_task is not None and not session_task.done():
+            if self._init_result is not None and not self._init_result.done():
+                session_task.cancel()
+            else:
+                self._close_event.set()
+            # wait() rather than await: the task's outcome isn't ours to raise
+            await asyncio.wait([session_task])
+        elif tool_service is not None:
+            # No live session, but warm_up() may have created the tool service
+            await self._close_tool_service(tool_service)
+    
+    @staticmethod
+    async def _close_tool_service(tool_service: Any) -> None:
+        """Release a tool service (and the tool servers it registered)."""
+        try:
+            await tool_service.cleanup()
+            logger.info("✅ MCP service cleaned up")
+        except Exception as e:
+            logger.error("❌ MCP cleanup error: %s", e)
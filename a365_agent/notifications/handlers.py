@@ -7,8 +7,9 @@ Safe handlers for sending responses to various notification channels.
 These handle timeouts and errors gracefully.
 """
 
+import asyncio
 import logging
-from typing import Optional
+from typing import Awaitable, Optional, TypeVar
 
 from aiohttp.client_exceptions import ClientResponseError
 from microsoft_agents.hosting.core import TurnContext
@@ -16,6 +17,8 @@ from microsoft_agents_a365.notifications import EmailResponse
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 # =============================================================================
 # SAFE RESPONSE HELPERS
@@ -41,12 +44,12 @@ async def safe_send_activity(context: TurnContext, message: str) -> bool:
         return True
     except ClientResponseError as e:
         if e.status == 404:
-            logger.warning(f"⚠️ Reply window expired (404). Message was: {message[:100]}...")
+            logger.warning("⚠️ Reply window expired (404). Message was: %.100s...", message)
             return False
-        logger.error(f"❌ Failed to send activity: {e}")
+        logger.error("❌ Failed to send activity: %s", e)
         return False
     except Exception as e:
-        logger.error(f"❌ Unexpected error sending activity: {e}")
+        logger.error("❌ Unexpected error sending activity: %s", e)
         return False
 
 
@@ -64,6 +67,9 @@ async def safe_send_email_response(context: TurnContext, response: str) -> bool:
         True if sent successfully, False otherwise
     """
     try:
+        # Build a fresh activity per send: the envelope is just a message with
+        # one EmailResponse entity, and send_activity fills in conversation/ids
+        # on the instance it is given, so a shared template would leak state.
         response_activity = EmailResponse.create_email_response_activity(response)
         await context.send_activity(response_activity)
         logger.info("✅ Email response sent successfully")
@@ -71,14 +77,15 @@ async def safe_send_email_response(context: TurnContext, response: str) -> bool:
     except ClientResponseError as e:
         if e.status == 404:
             logger.warning(
-                f"⚠️ Email reply window expired (404). Response was: {response[:100]}... "
-                f"The notification channel timed out, but the email was processed."
+                "⚠️ Email reply window expired (404). Response was: %.100s... "
+                "The notification channel timed out, but the email was processed.",
+                response,
             )
             return False
-        logger.error(f"❌ Failed to send email response: {e}")
+        logger.error("❌ Failed to send email response: %s", e)
         return False
     except Exception as e:
-        logger.error(f"❌ Unexpected error sending email response: {e}")
+        logger.error("❌ Unexpected error sending email response: %s", e)
         return False
 
 
@@ -98,6 +105,31 @@ class NotificationHandlerMixin:
     EMAIL_NOTIFICATION_TIMEOUT = 25  # Email channel typically times out at ~30s
     DOC_NOTIFICATION_TIMEOUT = 25    # Word/Excel/PowerPoint
     
+    async def run_with_timeout(
+        self,
+        coro: Awaitable[T],
+        timeout: float,
+        context: TurnContext,
+        notification_type: str,
+        is_email: bool = False,
+    ) -> Optional[T]:
+        """
+        Run notification processing within the channel's reply window.
+        
+        If ``coro`` does not finish within ``timeout`` seconds it is cancelled
+        and a "timed out, please retry" reply is sent right away, while the
+        channel can still accept it.
+        
+        Returns:
+            The result of ``coro``, or None if it timed out
+        """
+        try:
+            return await asyncio.wait_for(coro, timeout)
+        except asyncio.TimeoutError:
+            logger.warning("⚠️ %s timeout after %ss", notification_type, timeout)
+            await self._handle_notification_timeout(context, notification_type, is_email)
+            return None
+    
     async def _handle_notification_timeout(
         self,
         context: TurnContext,
@@ -105,9 +137,8 @@ class NotificationHandlerMixin:
         is_email: bool = False,
     ) -> None:
         """Handle a notification that timed out during processing."""
-        logger.warning(f"⚠️ {notification_type} processing timeout")
-        
-        message = "Thank you for your message. I'm still processing and will respond shortly."
+        # The work was cancelled, so nothing else will reply; ask for a retry
+        message = "Sorry, your request timed out before I could finish. Please try again."
         
         if is_email:
             await safe_send_email_response(context, message)
@@ -122,7 +153,7 @@ class NotificationHandlerMixin:
         is_email: bool = False,
     ) -> None:
         """Handle an error that occurred during notification processing."""
-        logger.error(f"❌ {notification_type} notification error: {error}")
+        logger.error("❌ %s notification error: %s", notification_type, error)
         
         message = f"Thank you for your message. I encountered an issue but will review it."
         
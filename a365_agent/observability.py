@@ -8,16 +8,51 @@ Integrates with Microsoft Agent 365 Observability SDK.
 """
 
 import logging
-from typing import Callable, Optional
+import os
+import time
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Callable, Optional
 
-from a365_agent.auth import get_cached_agentic_token
-from a365_agent.config import get_settings
+if TYPE_CHECKING:
+    from a365_agent.auth import get_cached_agentic_token
+    from a365_agent.config import get_settings
 
 logger = logging.getLogger(__name__)
 
 # Type alias for token resolver function
 TokenResolver = Callable[[str, str], Optional[str]]
 
+# BaggageBuilder class once probed (None if the SDK is missing); see
+# _get_baggage_builder
+_BaggageBuilder: Optional[type] = None
+_BAGGAGE_PROBED = False
+
+# auth/config are imported on first use so that importing ObservabilityContext
+# doesn't pull in azure.identity and the settings graph.
+_get_cached_agentic_token: Optional[TokenResolver] = None
+
+# The exporter asks for a token on every export, so resolved tokens are
+# reused for this long without going back to the locked auth cache. The
+# auth cache only hands out tokens with minutes of validity left, so a
+# reused token can't expire within this window.
+_RESOLVED_TOKEN_TTL_SECONDS = 60.0
+
+# (tenant_id, agent_id) -> (token, monotonic deadline for reuse), oldest
+# first; bounded like the auth TokenCache (TOKEN_CACHE_MAX_SIZE)
+_resolved_tokens: OrderedDict[tuple[str, str], tuple[str, float]] = OrderedDict()
+_RESOLVED_TOKENS_MAX_SIZE = int(os.getenv("TOKEN_CACHE_MAX_SIZE", "1024"))
+
+
+def __getattr__(name: str) -> Any:
+    """Resolve the formerly re-exported auth/config helpers lazily (PEP 562)."""
+    if name == "get_cached_agentic_token":
+        from a365_agent.auth import get_cached_agentic_token
+        return get_cached_agentic_token
+    if name == "get_settings":
+        from a365_agent.config import get_settings
+        return get_settings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def default_token_resolver(agent_id: str, tenant_id: str) -> Optional[str]:
     """
@@ -33,13 +68,30 @@ def default_token_resolver(agent_id: str, tenant_id: str) -> Optional[str]:
     Returns:
         The cached agentic token, or None if not available
     """
+    global _get_cached_agentic_token
+    key = (tenant_id, agent_id)
+    resolved = _resolved_tokens.get(key)
+    if resolved is not None and resolved[1] > time.monotonic():
+        return resolved[0]
+    
     try:
-        cached_token = get_cached_agentic_token(tenant_id, agent_id)
-        if not cached_token:
-            logger.debug(f"No cached observability token for agent {agent_id}, tenant {tenant_id}")
+        if _get_cached_agentic_token is None:
+            from a365_agent.auth import get_cached_agentic_token
+            _get_cached_agentic_token = get_cached_agentic_token
+        
+        cached_token = _get_cached_agentic_token(tenant_id, agent_id)
+        _resolved_tokens.pop(key, None)
+        if cached_token:
+            _resolved_tokens[key] = (cached_token, time.monotonic() + _RESOLVED_TOKEN_TTL_SECONDS)
+            while len(_resolved_tokens) > _RESOLVED_TOKENS_MAX_SIZE:
+                _resolved_tokens.popitem(last=False)
+        else:
+            logger.debug(
+                "No cached observability token for agent %s, tenant %s", agent_id, tenant_id
+            )
         return cached_token
     except Exception as e:
-        logger.error(f"Error resolving observability token: {e}")
+        logger.error("Error resolving observability token: %s", e)
         return None
 
 
@@ -58,6 +110,8 @@ def configure_observability(
         service_name: Service name for telemetry. Defaults to settings value.
         service_namespace: Service namespace for telemetry. Defaults to settings value.
     """
+    from a365_agent.config import get_settings
+    
     settings = get_settings()
     
     if not settings.observability.enabled:
@@ -78,7 +132,7 @@ def configure_observability(
     except ImportError:
         logger.warning("⚠️ Observability SDK not available")
     except Exception as e:
-        logger.warning(f"⚠️ Failed to configure observability: {e}")
+        logger.warning("⚠️ Failed to configure observability: %s", e)
 
 
 def enable_agentframework_instrumentation() -> None:
@@ -99,7 +153,22 @@ def enable_agentframework_instrumentation() -> None:
     except ImportError:
         logger.warning("⚠️ AgentFramework instrumentor not available")
     except Exception as e:
-        logger.warning(f"⚠️ Failed to enable instrumentation: {e}")
+        logger.warning("⚠️ Failed to enable instrumentation: %s", e)
+
+
+def _get_baggage_builder() -> Optional[type]:
+    """Import BaggageBuilder on first use; remember if it isn't available."""
+    global _BaggageBuilder, _BAGGAGE_PROBED
+    if not _BAGGAGE_PROBED:
+        try:
+            from microsoft_agents_a365.observability.core.middleware.baggage_builder import (
+                BaggageBuilder,
+            )
+            _BaggageBuilder = BaggageBuilder
+        except ImportError:
+            logger.debug("Baggage builder not available")
+        _BAGGAGE_PROBED = True
+    return _BaggageBuilder
 
 
 class ObservabilityContext:
@@ -125,11 +194,11 @@ class ObservabilityContext:
     
     def __enter__(self):
         """Enter the observability context."""
+        BaggageBuilder = _get_baggage_builder()
+        if BaggageBuilder is None:
+            return self
+        
         try:
-            from microsoft_agents_a365.observability.core.middleware.baggage_builder import (
-                BaggageBuilder,
-            )
-            
             self._baggage_context = (
                 BaggageBuilder()
                 .tenant_id(self.tenant_id)
@@ -139,11 +208,8 @@ class ObservabilityContext:
             )
             return self._baggage_context.__enter__()
             
-        except ImportError:
-            logger.debug("Baggage builder not available")
-            return self
         except Exception as e:
-            logger.debug(f"Failed to create baggage context: {e}")
+            logger.debug("Failed to create baggage context: %s", e)
             return self
     
     def __exit__(self, exc_type, exc_val, exc_tb):
@@ -7,14 +7,28 @@ Provides autonomous (proactive) agent capabilities:
 - Token acquisition via Agent User Impersonation (3-step flow)
 - Mock auth/context objects for headless MCP initialization
 - Cron-based scheduler for periodic agent tasks
+
+Exports are resolved lazily (PEP 562): importing one name only loads the
+submodule that defines it, so e.g. ``MockAuthorization`` doesn't pull in
+aiohttp or the scheduler.
 """
 
-from a365_agent.proactive.auth import AgentCredentials, ProactiveTokenProvider
-from a365_agent.proactive.mock_context import (
-    MockAuthorization,
-    MockTurnContext,
-)
-from a365_agent.proactive.scheduler import ProactiveScheduler
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from a365_agent.proactive.auth import AgentCredentials, ProactiveTokenProvider
+    from a365_agent.proactive.mock_context import MockAuthorization, MockTurnContext
+    from a365_agent.proactive.scheduler import ProactiveScheduler
+
+# Exported name -> (module, attribute)
+_LAZY = {
+    "AgentCredentials": ("a365_agent.proactive.auth", "AgentCredentials"),
+    "ProactiveTokenProvider": ("a365_agent.proactive.auth", "ProactiveTokenProvider"),
+    "MockAuthorization": ("a365_agent.proactive.mock_context", "MockAuthorization"),
+    "MockTurnContext": ("a365_agent.proactive.mock_context", "MockTurnContext"),
+    "ProactiveScheduler": ("a365_agent.proactive.scheduler", "ProactiveScheduler"),
+}
 
 __all__ = [
     "AgentCredentials",
@@ -23,3 +37,18 @@ __all__ = [
     "MockTurnContext",
     "ProactiveScheduler",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    """Import an exported name on first access and cache it on the package."""
+    try:
+        module_name, attr = _LAZY[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(module_name), attr)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + __all__)
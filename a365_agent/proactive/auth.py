@@ -17,33 +17,114 @@ Reference:
     https://learn.microsoft.com/en-us/entra/agent-id/identity-platform/agent-user-oauth-flow
 """
 
+import asyncio
 import base64
+import contextlib
+import functools
 import json
 import logging
 import os
+import re
+import time
 from dataclasses import dataclass
-from typing import Optional
-
-import aiohttp
+from typing import TYPE_CHECKING, Optional
 
 from a365_agent.config import get_settings
 
+if TYPE_CHECKING:
+    import aiohttp
+
+# orjson parses the STS responses faster when installed; it is optional
+try:
+    import orjson
+
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
 logger = logging.getLogger(__name__)
 
 # Default MCP platform audience (Agent 365 MCP)
 _DEFAULT_MCP_AUDIENCE = "ea9ffc3e-8a23-4a7d-836d-234d7c7565c1"
 
+# Cached MCP tokens are refreshed this many seconds before they expire
+_TOKEN_REFRESH_SKEW_SECONDS = 300
+
+# Only headers STS needs; nothing from the caller's trace/baggage context
+_STS_SESSION_HEADERS = {"Accept": "application/json"}
+
+
+@contextlib.contextmanager
+def _without_trace_context():
+    """
+    Run STS calls outside any OpenTelemetry context.
+
+    Token requests may happen inside an ObservabilityContext whose baggage
+    (tenant/agent/correlation IDs) would otherwise be propagated as headers
+    by an instrumented HTTP client. AAD doesn't need it.
+    """
+    try:
+        from opentelemetry import context as otel_context
+    except ImportError:
+        yield
+        return
 
-def _decode_jwt_payload(token: str) -> dict:
-    """Decode the payload section of a JWT for logging (best-effort)."""
+    token = otel_context.attach(otel_context.Context())
     try:
-        payload_b64 = token.split(".")[1]
-        padding = 4 - (len(payload_b64) % 4)
-        if padding != 4:
-            payload_b64 += "=" * padding
-        return json.loads(base64.urlsafe_b64decode(payload_b64))
+        yield
+    finally:
+        otel_context.detach(token)
+
+
+def create_token_session() -> "aiohttp.ClientSession":
+    """
+    Create an HTTP session for STS token requests.
+
+    Callers acquiring tokens for several agents should create one session
+    and pass it to ``acquire_mcp_token`` so TLS connections are reused.
+    """
+    import aiohttp
+
+    return aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(limit=10, ttl_dns_cache=300, keepalive_timeout=60),
+        headers=_STS_SESSION_HEADERS,
+        trace_configs=[],
+    )
+
+
+_EXP_RE = re.compile(rb'"exp"\s*:\s*(\d+)')
+
+
+def _extract_exp(token: str) -> Optional[int]:
+    """Read the ``exp`` claim of a JWT without parsing the whole payload."""
+    try:
+        payload_b64 = token.split(".", 2)[1]
+        payload = base64.urlsafe_b64decode(payload_b64 + "=" * (-len(payload_b64) % 4))
     except Exception:
-        return {}
+        return None
+    match = _EXP_RE.search(payload)
+    return int(match.group(1)) if match else None
+
+
+@functools.lru_cache(maxsize=1)
+def _blueprint_env() -> tuple[str, str, str, str]:
+    """Shared Blueprint settings from the environment (read once per process)."""
+    return (
+        os.getenv("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTID", ""),
+        os.getenv("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTSECRET", ""),
+        os.getenv("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__TENANTID", ""),
+        os.getenv("MCP_AUDIENCE", _DEFAULT_MCP_AUDIENCE),
+    )
+
+
+# (label reported by validate(), attribute) for each required credential
+_REQUIRED_FIELDS = (
+    ("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTID (env)", "blueprint_client_id"),
+    ("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTSECRET (env)", "blueprint_client_secret"),
+    ("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__TENANTID (env)", "tenant_id"),
+    ("agent_identity_client_id (DB)", "agent_identity_client_id"),
+    ("agent_user_object_id (DB)", "agent_user_object_id"),
+)
 
 
 @dataclass
@@ -71,36 +152,25 @@ class AgentCredentials:
         Build credentials from a PostgreSQL agent_registry row,
         combined with shared Blueprint env vars.
         """
+        client_id, client_secret, tenant_id, mcp_audience = _blueprint_env()
         return cls(
             agent_user_id=agent_row.get("agent_user_id", ""),
             agent_identity_client_id=agent_row.get("agent_identity_client_id", ""),
             agent_user_object_id=agent_row.get("agent_user_object_id", ""),
-            blueprint_client_id=os.getenv(
-                "CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTID", ""
-            ),
-            blueprint_client_secret=os.getenv(
-                "CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTSECRET", ""
-            ),
-            tenant_id=os.getenv(
-                "CONNECTIONS__SERVICE_CONNECTION__SETTINGS__TENANTID", ""
-            ),
-            mcp_audience=os.getenv("MCP_AUDIENCE", _DEFAULT_MCP_AUDIENCE),
+            blueprint_client_id=client_id,
+            blueprint_client_secret=client_secret,
+            tenant_id=tenant_id,
+            mcp_audience=mcp_audience,
         )
 
+    @functools.cached_property
+    def token_url(self) -> str:
+        """AAD v2 token endpoint for this tenant (shared by all three steps)."""
+        return f"https://login.microsoftonline.com/{self.tenant_id}/oauth2/v2.0/token"
+
     def validate(self) -> list[str]:
         """Return list of missing fields (empty = all good)."""
-        missing: list[str] = []
-        if not self.blueprint_client_id:
-            missing.append("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTID (env)")
-        if not self.blueprint_client_secret:
-            missing.append("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__CLIENTSECRET (env)")
-        if not self.tenant_id:
-            missing.append("CONNECTIONS__SERVICE_CONNECTION__SETTINGS__TENANTID (env)")
-        if not self.agent_identity_client_id:
-            missing.append("agent_identity_client_id (DB)")
-        if not self.agent_user_object_id:
-            missing.append("agent_user_object_id (DB)")
-        return missing
+        return [label for label, attr in _REQUIRED_FIELDS if not getattr(self, attr)]
 
 
 class ProactiveTokenProvider:
@@ -110,12 +180,35 @@ class ProactiveTokenProvider:
 
     Accepts ``AgentCredentials`` so the same provider can serve
     multiple agents in a single scheduler loop.
+
+    MCP tokens are cached per agent identity and audience until shortly
+    before their ``exp`` claim, so consecutive ticks skip the STS flow.
     """
 
-    async def acquire_mcp_token(self, creds: AgentCredentials) -> str:
+    def __init__(self):
+        self._cache: dict[str, tuple[str, float]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    def _get_cached(self, key: str) -> Optional[str]:
+        """Return the cached token for ``key`` if it is not about to expire."""
+        entry = self._cache.get(key)
+        if entry and entry[1] - time.time() > _TOKEN_REFRESH_SKEW_SECONDS:
+            return entry[0]
+        return None
+
+    async def acquire_mcp_token(
+        self,
+        creds: AgentCredentials,
+        session: Optional["aiohttp.ClientSession"] = None,
+    ) -> str:
         """
         Acquire an MCP-scoped token for the given agent credentials.
 
+        Args:
+            creds: Per-agent credentials
+            session: Optional shared session (see ``create_token_session``);
+                a short-lived one is created when omitted.
+
         Raises:
             RuntimeError: if credentials are incomplete or token acquisition fails.
         """
@@ -126,26 +219,49 @@ class ProactiveTokenProvider:
                 f"missing: {', '.join(missing)}"
             )
 
-        logger.info(f"🔑 Acquiring MCP token for {creds.agent_user_id}...")
-        return await self._agent_user_impersonation_flow(creds)
+        key = f"{creds.agent_identity_client_id}:{creds.mcp_audience}"
+        cached = self._get_cached(key)
+        if cached:
+            logger.debug("🔑 Reusing cached MCP token for %s", creds.agent_user_id)
+            return cached
+
+        # One refresh per agent at a time; waiters pick up the fresh token
+        lock = self._locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            cached = self._get_cached(key)
+            if cached:
+                return cached
+
+            logger.info("🔑 Acquiring MCP token for %s...", creds.agent_user_id)
+            if session is not None:
+                token = await self._agent_user_impersonation_flow(session, creds)
+            else:
+                async with create_token_session() as own_session:
+                    token = await self._agent_user_impersonation_flow(own_session, creds)
+
+            # exp is decoded once here; the reuse path only compares numbers
+            exp = _extract_exp(token)
+            if exp is not None:
+                self._cache[key] = (token, float(exp))
+            return token
 
     # ------------------------------------------------------------------
     # 3-step Agent User Impersonation flow
     # ------------------------------------------------------------------
 
-    async def _agent_user_impersonation_flow(self, creds: AgentCredentials) -> str:
+    async def _agent_user_impersonation_flow(
+        self, session: "aiohttp.ClientSession", creds: AgentCredentials
+    ) -> str:
         """Execute the T1 → T2 → user_fic flow and return the MCP token."""
-        async with aiohttp.ClientSession() as session:
+        with _without_trace_context():
             t1 = await self._get_t1(session, creds)
             t2 = await self._get_t2(session, creds, t1)
             mcp_token = await self._get_mcp_token(session, creds, t1, t2)
-            return mcp_token
+        return mcp_token
 
-    async def _get_t1(self, session: aiohttp.ClientSession, creds: AgentCredentials) -> str:
+    async def _get_t1(self, session: "aiohttp.ClientSession", creds: AgentCredentials) -> str:
         """Step 1: Blueprint → Agent Identity exchange token (T1)."""
-        logger.info("   Step 1/3: Acquiring T1 (Blueprint → Agent Identity)...")
-        token_url = f"https://login.microsoftonline.com/{creds.tenant_id}/oauth2/v2.0/token"
-
+        logger.debug("   Step 1/3: Acquiring T1 (Blueprint → Agent Identity)...")
         data = {
             "client_id": creds.blueprint_client_id,
             "scope": "api://AzureADTokenExchange/.default",
@@ -154,19 +270,17 @@ class ProactiveTokenProvider:
             "fmi_path": creds.agent_identity_client_id,
         }
 
-        async with session.post(token_url, data=data) as resp:
-            result = await resp.json()
+        async with session.post(creds.token_url, data=data) as resp:
+            result = await resp.json(loads=_json_loads)
             if resp.status != 200:
                 raise RuntimeError(f"T1 failed: {result.get('error_description', result)}")
             token = result["access_token"]
-            logger.info(f"   T1 acquired ({len(token)} chars)")
+            logger.debug("   T1 acquired (%d chars)", len(token))
             return token
 
-    async def _get_t2(self, session: aiohttp.ClientSession, creds: AgentCredentials, t1: str) -> str:
+    async def _get_t2(self, session: "aiohttp.ClientSession", creds: AgentCredentials, t1: str) -> str:
         """Step 2: Agent Identity → Agent User exchange token (T2)."""
-        logger.info("   Step 2/3: Acquiring T2 (Agent Identity → Agent User)...")
-        token_url = f"https://login.microsoftonline.com/{creds.tenant_id}/oauth2/v2.0/token"
-
+        logger.debug("   Step 2/3: Acquiring T2 (Agent Identity → Agent User)...")
         data = {
             "client_id": creds.agent_identity_client_id,
             "scope": "api://AzureADTokenExchange/.default",
@@ -175,21 +289,19 @@ class ProactiveTokenProvider:
             "client_assertion": t1,
         }
 
-        async with session.post(token_url, data=data) as resp:
-            result = await resp.json()
+        async with session.post(creds.token_url, data=data) as resp:
+            result = await resp.json(loads=_json_loads)
             if resp.status != 200:
                 raise RuntimeError(f"T2 failed: {result.get('error_description', result)}")
             token = result["access_token"]
-            logger.info(f"   T2 acquired ({len(token)} chars)")
+            logger.debug("   T2 acquired (%d chars)", len(token))
             return token
 
     async def _get_mcp_token(
-        self, session: aiohttp.ClientSession, creds: AgentCredentials, t1: str, t2: str
+        self, session: "aiohttp.ClientSession", creds: AgentCredentials, t1: str, t2: str
     ) -> str:
         """Step 3: user_fic grant → MCP-scoped token."""
-        logger.info("   Step 3/3: Acquiring MCP token (user_fic grant)...")
-        token_url = f"https://login.microsoftonline.com/{creds.tenant_id}/oauth2/v2.0/token"
-
+        logger.debug("   Step 3/3: Acquiring MCP token (user_fic grant)...")
         data = {
             "client_id": creds.agent_identity_client_id,
             "scope": f"{creds.mcp_audience}/.default",
@@ -200,11 +312,11 @@ class ProactiveTokenProvider:
             "user_federated_identity_credential": t2,
         }
 
-        async with session.post(token_url, data=data) as resp:
-            result = await resp.json()
+        async with session.post(creds.token_url, data=data) as resp:
+            result = await resp.json(loads=_json_loads)
             if resp.status != 200:
                 desc = result.get("error_description", result.get("error", str(result)))
                 raise RuntimeError(f"MCP token failed: {desc}")
             token = result["access_token"]
-            logger.info(f"   MCP token acquired ({len(token)} chars)")
+            logger.debug("   MCP token acquired (%d chars)", len(token))
             return token
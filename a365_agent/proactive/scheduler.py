@@ -25,18 +25,29 @@ Timeouts:
     - Per-task execution: CRON_TASK_TIMEOUT_SECONDS (default: 120)
     - MCP initialization: 60s
     - Token acquisition: 30s
+
+Concurrency:
+    - Agents processed in parallel per tick: CRON_MAX_CONCURRENCY (default: 8)
 """
 
 import asyncio
+import functools
+import importlib.resources
 import logging
 import os
+import time
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional
+from typing import Any, Optional
 
+from a365_agent.chat import get_chat_client
 from a365_agent.config import get_settings
 from a365_agent.mcp import MCPService
-from a365_agent.proactive.auth import AgentCredentials, ProactiveTokenProvider
+from a365_agent.proactive.auth import (
+    AgentCredentials,
+    ProactiveTokenProvider,
+    create_token_session,
+)
 from a365_agent.proactive.mock_context import MockAuthorization, MockTurnContext
 
 logger = logging.getLogger(__name__)
@@ -46,35 +57,66 @@ logger = logging.getLogger(__name__)
 # Helpers
 # ---------------------------------------------------------------------------
 
-def _load_cron_system_prompt(agent_upn: str = "", manager_email: str = "") -> str:
-    """Load the cron system prompt and inject agent identity.
+@functools.lru_cache(maxsize=1)
+def _read_cron_prompt_template() -> str:
+    """Read the cron system prompt template once per process.
 
-    The prompt template uses {agent_upn} and {manager_email} placeholders
-    so the LLM already knows who it is without calling getMyProfile.
+    The template ships as package data next to this module; the path can
+    be overridden with ``A365_CRON_PROMPT_PATH``.
     """
-    path = Path(__file__).resolve().parent.parent.parent / "agents" / "cron_system_prompt.md"
-    if not path.exists():
-        raise FileNotFoundError(f"Required file not found: {path}")
-    raw = path.read_text(encoding="utf-8").strip()
-    try:
-        return raw.format(agent_upn=agent_upn, manager_email=manager_email)
-    except KeyError:
-        return raw
+    override = os.getenv("A365_CRON_PROMPT_PATH")
+    if override:
+        path = Path(override)
+        if not path.exists():
+            raise FileNotFoundError(f"Required file not found: {path}")
+        return path.read_text(encoding="utf-8").strip()
+
+    resource = importlib.resources.files(__package__).joinpath("cron_system_prompt.md")
+    return resource.read_text(encoding="utf-8").strip()
+
+
+def _load_cron_system_prompt() -> str:
+    """Load the cron system prompt.
+
+    The prompt is byte-identical for every agent and tick, so providers can
+    serve it from their prompt cache. Agent identity and the current time
+    are sent in the task message instead (see ``_render_task_prompt``).
+    """
+    return _read_cron_prompt_template()
 
 
 def _render_task_prompt(task_prompt: str, manager_email: str, agent_upn: str) -> str:
-    """Substitute runtime variables into a task prompt from the DB."""
+    """Build the user message for a task prompt from the DB.
+
+    Runtime variables are substituted into the prompt, and a trailing
+    ``Runtime:`` line gives the agent's identity and the current time, so
+    the LLM knows who it is without calling getMyProfile.
+    """
     now = datetime.now(timezone.utc).isoformat(timespec="seconds")
     try:
-        return task_prompt.format(
+        body = task_prompt.format(
             manager_email=manager_email,
             target_email=manager_email,  # alias for backwards compat
             agent_upn=agent_upn,
             timestamp=now,
         )
     except KeyError:
-        # If the prompt doesn't use all placeholders, just return as-is
-        return task_prompt
+        # If the prompt doesn't use all placeholders, use it as-is
+        body = task_prompt
+    return f"{body}\n\n---\nRuntime: timestamp={now} agent={agent_upn} manager={manager_email}"
+
+
+# Longest task result persisted to scheduled_tasks.last_result
+_MAX_RESULT_CHARS = 2000
+
+
+def _result_text(result) -> str:
+    """Return the text of an ``agent.run()`` result."""
+    for attr in ("contents", "text", "content"):
+        value = getattr(result, attr, None)
+        if value is not None:
+            return str(value)
+    return str(result)
 
 
 # ---------------------------------------------------------------------------
@@ -88,8 +130,8 @@ class ProactiveScheduler:
     On each tick:
         1. Query all agents with enabled scheduled_tasks from PostgreSQL
         2. For each agent, acquire an MCP token (Blueprint .env + agent identity from DB)
-        3. Init MCP, load tasks, run agent for each task, log results
-        4. Cleanup and sleep
+        3. Init MCP (or reuse the pooled session), run agent for each task, log results
+        4. Sleep (pooled MCP sessions are released on token refresh or stop())
 
     Lifecycle:
         scheduler = ProactiveScheduler()
@@ -103,9 +145,17 @@ class ProactiveScheduler:
             os.getenv("CRON_INTERVAL_SECONDS", "3600")
         )
         self.task_timeout = int(os.getenv("CRON_TASK_TIMEOUT_SECONDS", "120"))
+        self.max_concurrency = max(1, int(os.getenv("CRON_MAX_CONCURRENCY", "8")))
+        self.log_sample_rate = max(1, int(os.getenv("CRON_LOG_SAMPLE_RATE", "1")))
+        self._completed_tasks = 0
         self._running = False
         self._task: Optional[asyncio.Task] = None
+        self._stop_event: Optional[asyncio.Event] = None
         self._token_provider = ProactiveTokenProvider()
+        # agent_upn -> (MCPService, agent, (mcp_token, manager_email))
+        self._mcp_cache: dict[str, tuple[MCPService, Any, tuple[str, str]]] = {}
+        # Storage used by the last tick (flushed on stop)
+        self._storage = None
 
     # ------------------------------------------------------------------
     # Public API
@@ -118,7 +168,9 @@ class ProactiveScheduler:
             return
 
         self._running = True
-        logger.info(f"⏰ Proactive scheduler started — interval {self.interval}s")
+        # Created here so the event binds to the running loop
+        self._stop_event = asyncio.Event()
+        logger.info("⏰ Proactive scheduler started — interval %ss", self.interval)
 
         while self._running:
             try:
@@ -126,23 +178,29 @@ class ProactiveScheduler:
             except Exception:
                 logger.exception("❌ Cron tick failed (will retry next interval)")
 
-            # Sleep in small increments so we can bail quickly on stop()
-            for _ in range(self.interval):
-                if not self._running:
-                    break
-                await asyncio.sleep(1)
+            # Sleep until the next tick, waking immediately on stop()
+            try:
+                await asyncio.wait_for(self._stop_event.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                pass
 
         logger.info("⏰ Proactive scheduler stopped")
 
     async def stop(self) -> None:
-        """Signal the scheduler to stop after the current sleep."""
+        """Signal the scheduler to stop, interrupting the current sleep."""
         self._running = False
+        if self._stop_event:
+            self._stop_event.set()
         if self._task and not self._task.done():
             self._task.cancel()
             try:
                 await self._task
             except asyncio.CancelledError:
                 pass
+        await self._close_mcp_agents()
+        # Let queued task-result writes land before shutdown
+        if self._storage is not None:
+            await self._storage.flush_writes()
 
     # ------------------------------------------------------------------
     # Single execution tick — loops through ALL agents
@@ -150,88 +208,156 @@ class ProactiveScheduler:
 
     async def _tick(self) -> None:
         """Execute one cron cycle across all agents with scheduled tasks."""
-        tick_start = datetime.now(timezone.utc)
+        tick_start_ns = time.monotonic_ns()
         logger.info("🔄 Cron tick starting...")
 
         from a365_agent.storage import get_storage
-        storage = await get_storage()
+        storage = self._storage = await get_storage()
+
+        # 1. Get all agents that have enabled scheduled tasks (with their tasks)
+        agents = await storage.get_agents_and_their_tasks()
+
+        # Release pooled MCP sessions of agents that no longer have tasks
+        active = {agent_row["agent_user_id"] for agent_row in agents}
+        for agent_upn in [upn for upn in self._mcp_cache if upn not in active]:
+            await self._evict_mcp_agent(agent_upn)
 
-        # 1. Get all agents that have enabled scheduled tasks
-        agents = await storage.get_all_agents_with_tasks()
         if not agents:
             logger.info("📋 No agents with enabled scheduled tasks — skipping tick")
             return
 
-        logger.info(f"📋 Found {len(agents)} agent(s) with scheduled tasks")
+        logger.info("📋 Found %d agent(s) with scheduled tasks", len(agents))
 
-        # 2. Process each agent
-        for agent_row in agents:
-            agent_upn = agent_row["agent_user_id"]
-            try:
-                await self._process_agent(storage, agent_row)
-            except Exception:
-                logger.exception(f"❌ Failed processing agent {agent_upn}")
+        # 2. Process agents concurrently (bounded), sharing one STS session
+        sem = asyncio.Semaphore(self.max_concurrency)
 
-        tick_end = datetime.now(timezone.utc)
-        duration_ms = int((tick_end - tick_start).total_seconds() * 1000)
-        logger.info(f"✅ Cron tick completed in {duration_ms}ms ({len(agents)} agents)")
+        async def _bounded(agent_row: dict, session) -> None:
+            async with sem:
+                await self._process_agent(storage, agent_row, session)
+
+        async with create_token_session() as session:
+            results = await asyncio.gather(
+                *(_bounded(agent_row, session) for agent_row in agents),
+                return_exceptions=True,
+            )
+
+        for agent_row, result in zip(agents, results):
+            if isinstance(result, Exception):
+                logger.error(
+                    "❌ Failed processing agent %s",
+                    agent_row["agent_user_id"],
+                    exc_info=result,
+                )
+
+        duration_ms = (time.monotonic_ns() - tick_start_ns) // 1_000_000
+        logger.info("✅ Cron tick completed in %dms (%d agents)", duration_ms, len(agents))
 
     # ------------------------------------------------------------------
     # Per-agent processing
     # ------------------------------------------------------------------
 
-    async def _process_agent(self, storage, agent_row: dict) -> None:
+    async def _process_agent(self, storage, agent_row: dict, session=None) -> None:
         """Acquire token for one agent, run all its scheduled tasks."""
         agent_upn = agent_row["agent_user_id"]
         manager_email = agent_row.get("manager_email", "")
-        logger.info(f"Processing agent: {agent_upn} (manager: {manager_email})")
+        logger.info("Processing agent: %s (manager: %s)", agent_upn, manager_email)
 
         # Build per-agent credentials (Blueprint from .env + identity from DB)
         creds = AgentCredentials.from_agent_row(agent_row)
         missing = creds.validate()
         if missing:
             logger.error(
-                f"Skipping {agent_upn} — missing credentials: {', '.join(missing)}"
+                "Skipping %s — missing credentials: %s", agent_upn, ", ".join(missing)
             )
             return
 
         # Acquire MCP token for this agent (with timeout)
         try:
             async with asyncio.timeout(30):
-                mcp_token = await self._token_provider.acquire_mcp_token(creds)
-            logger.info(f"Token acquired for {agent_upn}")
+                mcp_token = await self._token_provider.acquire_mcp_token(creds, session=session)
+            logger.info("Token acquired for %s", agent_upn)
         except asyncio.TimeoutError:
-            logger.error(f"Token acquisition timed out for {agent_upn} (30s)")
+            logger.error("Token acquisition timed out for %s (30s)", agent_upn)
             return
         except Exception as e:
-            logger.error(f"Token acquisition failed for {agent_upn}: {e}")
+            logger.error("Token acquisition failed for %s: %s", agent_upn, e)
             return
 
-        # Get scheduled tasks for this agent
-        tasks = await storage.get_scheduled_tasks(agent_upn)
+        # Scheduled tasks come with the agent row; query only if absent
+        tasks = agent_row.get("tasks")
+        if tasks is None:
+            tasks = await storage.get_scheduled_tasks(agent_upn)
         if not tasks:
-            logger.info(f"No enabled tasks for {agent_upn} — skipping")
+            logger.info("No enabled tasks for %s — skipping", agent_upn)
             return
 
-        logger.info(f"{len(tasks)} task(s) for {agent_upn}")
+        logger.info("%d task(s) for %s", len(tasks), agent_upn)
+
+        # Reuse the agent's MCP session across ticks (all tasks share it)
+        agent = await self._get_mcp_agent(agent_upn, manager_email, mcp_token)
+        if agent is None:
+            return
+
+        # Execute each task (with per-task timeout)
+        try:
+            for task_row in tasks:
+                if agent is None:
+                    agent = await self._get_mcp_agent(agent_upn, manager_email, mcp_token)
+                    if agent is None:
+                        return
+                status = await self._execute_task(
+                    storage, agent, agent_upn, manager_email, task_row
+                )
+                if status != "success":
+                    # The session may be what failed (closed transport, expired
+                    # MCP auth), and a timeout cancels it mid-call; rebuild it
+                    # rather than failing every remaining task on it
+                    await self._evict_mcp_agent(agent_upn)
+                    agent = None
+        except BaseException:
+            # Don't keep a session that was interrupted mid-task
+            await self._evict_mcp_agent(agent_upn)
+            raise
+
+    # ------------------------------------------------------------------
+    # Pooled MCP sessions
+    # ------------------------------------------------------------------
 
-        # Init MCP servers once per agent (all tasks share the same session)
+    async def _get_mcp_agent(
+        self, agent_upn: str, manager_email: str, mcp_token: str
+    ) -> Optional[Any]:
+        """Return the agent's pooled MCP-enabled agent, building it if needed.
+
+        A pooled session is reused while the agent's MCP token (cached by
+        the token provider until near expiry) and manager are unchanged;
+        a refreshed token replaces the session.
+        """
+        fingerprint = (mcp_token, manager_email)
+        cached = self._mcp_cache.get(agent_upn)
+        if cached and cached[2] == fingerprint:
+            logger.info("Reusing MCP session for %s", agent_upn)
+            return cached[1]
+        if cached:
+            await self._evict_mcp_agent(agent_upn)
+
+        built = await self._build_mcp_agent(agent_upn, manager_email, mcp_token)
+        if built is None:
+            return None
+        mcp_service, agent = built
+        self._mcp_cache[agent_upn] = (mcp_service, agent, fingerprint)
+        return agent
+
+    async def _build_mcp_agent(
+        self, agent_upn: str, manager_email: str, mcp_token: str
+    ) -> Optional[tuple[MCPService, Any]]:
+        """Create a chat client and initialize MCP servers for one agent."""
         settings = get_settings()
         if not settings.model_pool or len(settings.model_pool) == 0:
             raise RuntimeError("No Azure OpenAI models configured (model_pool is empty)")
 
-        model = settings.model_pool.get_next_model()
-
-        from agent_framework.azure import AzureOpenAIChatClient
-
-        chat_client = AzureOpenAIChatClient(
-            endpoint=model.endpoint,
-            api_key=model.api_key,
-            deployment_name=model.deployment,
-            api_version=model.api_version,
-        )
+        chat_client = get_chat_client(settings.model_pool.get_next_model())
 
-        system_prompt = _load_cron_system_prompt(agent_upn=agent_upn, manager_email=manager_email)
+        system_prompt = _load_cron_system_prompt()
         mock_auth = MockAuthorization(mcp_token)
         mock_ctx = MockTurnContext(agent_upn)
 
@@ -247,39 +373,42 @@ class ProactiveScheduler:
                     turn_context=mock_ctx,
                 )
         except asyncio.TimeoutError:
-            logger.error(f"MCP initialization timed out for {agent_upn} (60s)")
+            logger.error("MCP initialization timed out for %s (60s)", agent_upn)
             await mcp_service.cleanup()
-            return
+            return None
         except Exception as e:
-            logger.error(f"MCP initialization failed for {agent_upn}: {e}")
+            logger.error("MCP initialization failed for %s: %s", agent_upn, e)
             await mcp_service.cleanup()
-            return
+            return None
 
         if agent is None:
-            logger.error(f"MCP initialization returned None for {agent_upn}")
+            logger.error("MCP initialization returned None for %s", agent_upn)
             await mcp_service.cleanup()
-            return
+            return None
 
         # Optionally upgrade to planning model
         planning_pool = settings.planning_pool
         if planning_pool and len(planning_pool) > 0:
             planning_cfg = planning_pool.get_next_model()
-            planning_client = AzureOpenAIChatClient(
-                endpoint=planning_cfg.endpoint,
-                api_key=planning_cfg.api_key,
-                deployment_name=planning_cfg.deployment,
-                api_version=planning_cfg.api_version,
-            )
-            agent.chat_client = planning_client
-            logger.info(f"Upgraded to planning model: {planning_cfg.name}")
+            agent.chat_client = get_chat_client(planning_cfg)
+            logger.info("Upgraded to planning model: %s", planning_cfg.name)
 
-        # Execute each task (with per-task timeout)
-        try:
-            for task_row in tasks:
-                await self._execute_task(storage, agent, agent_upn, manager_email, task_row)
-        finally:
-            # Always cleanup MCP, even if a task fails
-            await mcp_service.cleanup()
+        return mcp_service, agent
+
+    async def _evict_mcp_agent(self, agent_upn: str) -> None:
+        """Drop an agent's pooled MCP session and release its resources.
+
+        Safe from any tick or from ``stop()``: MCPService tears the session
+        down on the task that opened it.
+        """
+        cached = self._mcp_cache.pop(agent_upn, None)
+        if cached:
+            await cached[0].cleanup()
+
+    async def _close_mcp_agents(self) -> None:
+        """Release every pooled MCP session."""
+        for agent_upn in list(self._mcp_cache):
+            await self._evict_mcp_agent(agent_upn)
 
     # ------------------------------------------------------------------
     # Single task execution
@@ -287,72 +416,67 @@ class ProactiveScheduler:
 
     async def _execute_task(
         self, storage, agent, agent_upn: str, manager_email: str, task_row: dict
-    ) -> None:
-        """Run one scheduled task with a timeout and log the result."""
+    ) -> str:
+        """Run one scheduled task with a timeout and log the result.
+
+        Returns the task's status: "success", "timeout" or "error".
+        """
         task_id = task_row["task_id"]
         task_name = task_row["task_name"]
         raw_prompt = task_row["task_prompt"]
 
-        logger.info(f"Running task '{task_name}' for {agent_upn} (timeout={self.task_timeout}s)...")
+        logger.info(
+            "Running task '%s' for %s (timeout=%ss)...", task_name, agent_upn, self.task_timeout
+        )
 
         # Render the prompt with runtime variables
         prompt = _render_task_prompt(raw_prompt, manager_email, agent_upn)
-        logger.info(f"Task prompt: {prompt[:200]}{'...' if len(prompt) > 200 else ''}")
+        logger.debug("Task prompt: %.200s", prompt)
 
-        task_start = datetime.now(timezone.utc)
+        task_start_ns = time.monotonic_ns()
         status = "success"
         response = ""
 
         try:
             async with asyncio.timeout(self.task_timeout):
-                logger.info(f"Calling agent.run() for task '{task_name}'...")
+                logger.debug("Calling agent.run() for task '%s'...", task_name)
                 result = await agent.run(prompt)
-                logger.info(f"agent.run() returned for task '{task_name}'")
-
-            # Extract response text
-            if hasattr(result, "contents"):
-                response = str(result.contents)
-            elif hasattr(result, "text"):
-                response = str(result.text)
-            elif hasattr(result, "content"):
-                response = str(result.content)
-            else:
-                response = str(result)
-
-            logger.info(
-                f"Task '{task_name}' completed: "
-                f"{response[:150]}{'...' if len(response) > 150 else ''}"
-            )
+                logger.debug("agent.run() returned for task '%s'", task_name)
+
+            # Extract response text once; only the stored prefix is kept
+            response = _result_text(result)[:_MAX_RESULT_CHARS]
+
+            # Head-sample success logs (CRON_LOG_SAMPLE_RATE=N logs 1 in N)
+            self._completed_tasks += 1
+            if self._completed_tasks % self.log_sample_rate == 0:
+                logger.info("Task '%s' completed: %.150s", task_name, response)
         except asyncio.TimeoutError:
             status = "timeout"
             response = f"Task timed out after {self.task_timeout}s"
-            logger.error(f"Task '{task_name}' timed out after {self.task_timeout}s")
+            logger.error("Task '%s' timed out after %ss", task_name, self.task_timeout)
         except Exception as e:
             status = "error"
             response = str(e)
-            logger.error(f"Task '{task_name}' failed: {e}")
+            logger.error("Task '%s' failed: %s", task_name, e)
 
-        # Update task result in DB
-        task_end = datetime.now(timezone.utc)
-        duration_ms = int((task_end - task_start).total_seconds() * 1000)
+        # Record the result in the background; the next task doesn't depend on it
+        duration_ms = (time.monotonic_ns() - task_start_ns) // 1_000_000
 
-        try:
-            await storage.update_scheduled_task_result(
+        storage.submit_write(
+            storage.record_task_completion(
                 task_id=str(task_id),
-                status=status,
-                result_text=response[:2000],
-            )
-            await storage.log_tool_execution(
                 agent_id=agent_upn,
                 tool_name=f"cron:{task_name}",
+                status=status,
+                result_text=response,
                 conversation_id="proactive-cron",
                 tool_input={"prompt": prompt[:500]},
                 tool_output={"response": response[:500]},
-                status=status,
                 duration_ms=duration_ms,
-            )
-        except Exception:
-            logger.debug("⚠️ Could not log task result to PostgreSQL (non-fatal)")
+            ),
+            label=f"task result for '{task_name}'",
+        )
+        return status
 
 
 # ---------------------------------------------------------------------------
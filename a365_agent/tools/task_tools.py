@@ -3,9 +3,10 @@
 """
 Scheduled Task Management Tools
 
-Local FunctionTool definitions for managing cron-scheduled tasks in PostgreSQL.
-The agent uses these tools to create, list, update, and delete tasks that the
-background cron scheduler picks up and executes autonomously.
+Local FunctionTool for managing cron-scheduled tasks in PostgreSQL. The agent
+uses a single ``manage_scheduled_tasks`` tool to create, list, update, and
+delete tasks that the background cron scheduler picks up and executes
+autonomously.
 
 Scoped per agent UPN — each agent can only manage its own tasks.
 
@@ -14,222 +15,310 @@ Usage:
     # Then register on agent: agent.default_options["tools"].extend(tools)
 """
 
+import functools
+import json
 import logging
-from typing import Annotated, Optional
+import time
+import uuid
+from typing import Annotated, Literal, Optional
 
 from agent_framework import tool
 
+from a365_agent.storage import get_storage
+
+# orjson serializes tool results faster when installed; it is optional
+try:
+    import orjson
+
+    def _dumps(value: dict) -> str:
+        return orjson.dumps(value, default=str).decode()
+except ImportError:
+    def _dumps(value: dict) -> str:
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
 logger = logging.getLogger(__name__)
 
+# op='list' results are reused for this many seconds, so the
+# common list → update/delete sequence within a turn doesn't re-query
+_LIST_CACHE_TTL = 15.0
+
+# Default number of tasks op='list' returns
+_DEFAULT_LIST_LIMIT = 25
+
+# agent_upn -> (monotonic expiry, limit fetched with, tasks, more beyond limit)
+_list_cache: dict[str, tuple[float, int, list[dict], bool]] = {}
+
+# agent_upn -> write counter; a listing fetched across a write is not cached
+_list_versions: dict[str, int] = {}
+
+
+def _invalidate_task_list(agent_upn: str) -> None:
+    """Forget the cached listing for *agent_upn* after one of its tasks changed."""
+    _list_cache.pop(agent_upn, None)
+    _list_versions[agent_upn] = _list_versions.get(agent_upn, 0) + 1
+
+
+async def _get_task_list(agent_upn: str, limit: int) -> tuple[list[dict], bool]:
+    """The agent's first *limit* tasks and whether it has more, cached when fresh."""
+    cached = _list_cache.get(agent_upn)
+    if cached and cached[0] > time.monotonic():
+        _, cached_limit, tasks, more = cached
+        # Usable if it holds at least *limit* tasks or is already the full list
+        if limit <= cached_limit or not more:
+            return tasks[:limit], more or len(tasks) > limit
+
+    version = _list_versions.get(agent_upn, 0)
+    storage = await get_storage()
+    tasks, more = await storage.get_all_tasks_for_agent_json(agent_upn, limit=limit)
+    if _list_versions.get(agent_upn, 0) == version:
+        _list_cache[agent_upn] = (time.monotonic() + _LIST_CACHE_TTL, limit, tasks, more)
+    return tasks, more
+
+
+def _is_task_id(task_id: str) -> bool:
+    """True if *task_id* parses as a UUID (checked before any DB round-trip)."""
+    try:
+        uuid.UUID(task_id)
+    except (ValueError, TypeError, AttributeError):
+        return False
+    return True
+
+
+def _to_json(result: dict) -> str:
+    """Compact JSON tool result (fewer tokens for the model to read)."""
+    return _dumps(result)
+
+
+# ----------------------------------------------------------------------
+# Operations (dispatched by manage_scheduled_tasks)
+# ----------------------------------------------------------------------
+
+async def _list_tasks(agent_upn: str, limit: int) -> str:
+    """List the agent's tasks: {"tasks": [...], "more": bool}."""
+    limit = max(1, limit)
+    tasks, more = await _get_task_list(agent_upn, limit)
+    return _to_json({"tasks": tasks, "more": more})
+
+
+async def _create_task(
+    agent_upn: str, task_name: str, task_prompt: str, is_recurrent: bool
+) -> str:
+    """Create a task: {"task_id", "task_name", "is_enabled", "recurrent"}."""
+    try:
+        logger.info("Creating task '%s' for agent %s", task_name, agent_upn)
+        storage = await get_storage()
+        row = await storage.create_scheduled_task(
+            agent_user_id=agent_upn,
+            task_name=task_name,
+            task_prompt=task_prompt,
+            is_enabled=True,
+        )
+        _invalidate_task_list(agent_upn)
+        task_id = row.get("task_id", "unknown")
+        logger.info("Task created: %s (%s) for %s", task_name, task_id, agent_upn)
+        return _to_json({
+            "task_id": task_id,
+            "task_name": task_name,
+            "is_enabled": True,
+            "recurrent": is_recurrent,
+        })
+    except Exception as e:
+        logger.error("create_scheduled_task failed: %s", e)
+        return _to_json({"error": f"Error creating task: {e}"})
+
+
+async def _update_task(
+    agent_upn: str,
+    task_id: str,
+    task_name: Optional[str],
+    task_prompt: Optional[str],
+    is_enabled: Optional[bool],
+) -> str:
+    """Update a task: {"task_id", "task_name", "is_enabled", "changed"}."""
+    if not _is_task_id(task_id):
+        return _to_json({"error": f"Invalid task_id format: {task_id}"})
+    try:
+        if task_name is None and task_prompt is None and is_enabled is None:
+            return _to_json({
+                "error": "No fields provided to update. Specify at least one of: "
+                "task_name, task_prompt, is_enabled."
+            })
+
+        storage = await get_storage()
+        # None fields are left unchanged by the (fixed-shape) UPDATE, and
+        # repeated identical calls (common with LLM retries) write nothing
+        updated = await storage.update_scheduled_task_fields(
+            task_id,
+            task_name=task_name,
+            task_prompt=task_prompt,
+            is_enabled=is_enabled,
+        )
+        if updated is None:
+            return _to_json({
+                "error": f"Task {task_id} not found. "
+                "Use op='list' to check your tasks."
+            })
+        if updated["changed"]:
+            _invalidate_task_list(agent_upn)
+
+        return _to_json({
+            "task_id": task_id,
+            "task_name": updated.get("task_name"),
+            "is_enabled": updated.get("is_enabled"),
+            "changed": updated["changed"],
+        })
+    except Exception as e:
+        logger.error("update_scheduled_task failed: %s", e)
+        return _to_json({"error": f"Error updating task: {e}"})
+
+
+async def _delete_task(agent_upn: str, task_id: str) -> str:
+    """Delete one task: {"deleted": task_id}."""
+    if not _is_task_id(task_id):
+        return _to_json({"error": f"Invalid task_id format: {task_id}"})
+    try:
+        storage = await get_storage()
+        deleted = await storage.delete_scheduled_task(task_id)
+        _invalidate_task_list(agent_upn)
+        if not deleted:
+            return _to_json({
+                "error": f"Task {task_id} not found. "
+                "Use op='list' to check your tasks."
+            })
+
+        return _to_json({"deleted": task_id})
+    except Exception as e:
+        logger.error("delete_scheduled_task failed: %s", e)
+        return _to_json({"error": f"Error deleting task: {e}"})
+
+
+async def _delete_tasks(agent_upn: str, task_ids: list[str]) -> str:
+    """Delete several tasks: {"deleted": [...], "not_found": [...]}."""
+    # Malformed ids can't match a task; report them without sending them
+    valid_ids = [t for t in task_ids if _is_task_id(t)]
+    try:
+        deleted = []
+        if valid_ids:
+            storage = await get_storage()
+            deleted = await storage.delete_scheduled_tasks(valid_ids, agent_user_id=agent_upn)
+            _invalidate_task_list(agent_upn)
+        gone = {task_id.lower() for task_id in deleted}
+        return _to_json({
+            "deleted": deleted,
+            "not_found": [t for t in task_ids if t.strip().lower() not in gone],
+        })
+    except Exception as e:
+        logger.error("bulk_delete_scheduled_tasks failed: %s", e)
+        return _to_json({"error": f"Error deleting tasks: {e}"})
+
+
+# ----------------------------------------------------------------------
+# Tool factory
+# ----------------------------------------------------------------------
 
 def create_task_tools(agent_upn: str) -> list:
     """
     Create task-management FunctionTools scoped to *agent_upn*.
 
-    Returns a list of tools to register on a ChatAgent.
+    Returns a list of tools to register on a ChatAgent. All operations go
+    through a single ``manage_scheduled_tasks`` tool so only one schema is
+    sent to the model on every turn. The tool is built once per UPN and
+    shared by every agent instance for it (it holds no state besides the
+    UPN), so re-registering after the ChatAgent is recreated costs no new
+    closures or ``@tool`` schema work.
     """
+    return list(_build_task_tools(agent_upn))
 
-    # ------------------------------------------------------------------
-    # list_my_scheduled_tasks
-    # ------------------------------------------------------------------
-    @tool(name="list_my_scheduled_tasks", approval_mode="never_require")
-    async def list_my_scheduled_tasks() -> str:
-        """Retrieve every scheduled task that belongs to this agent from the
-        PostgreSQL database (both enabled and disabled).
-
-        Returns a formatted list with each task's task_id, name, prompt,
-        enabled/disabled status, last execution time, and last execution
-        result.
 
-        Call this tool when:
-        - The user asks "what tasks do I have?" or "show my tasks"
-        - You need to look up a task_id before updating or deleting a task
-        - The user wants to verify a task was created
+@functools.lru_cache(maxsize=256)
+def _build_task_tools(agent_upn: str) -> tuple:
+    """Build the tools for *agent_upn* (memoized by ``create_task_tools``)."""
 
-        This tool takes NO parameters — it automatically filters to the
-        current agent's tasks."""
-        from a365_agent.storage import get_storage
-
-        storage = await get_storage()
-        tasks = await storage.get_all_tasks_for_agent(agent_upn)
-        if not tasks:
-            return "You have no scheduled tasks yet."
-
-        lines = []
-        for i, t in enumerate(tasks, 1):
-            status = "Enabled" if t.get("is_enabled") else "Disabled"
-            last_run = str(t.get("last_run_at") or "Never run")
-            last_status = t.get("last_status") or "-"
-            prompt_preview = (t.get("task_prompt") or "")[:100]
-            lines.append(
-                f"{i}. {t['task_name']} ({status})\n"
-                f"   ID: {t['task_id']}\n"
-                f"   Prompt: {prompt_preview}\n"
-                f"   Last run: {last_run} ({last_status})"
-            )
-        return f"Your scheduled tasks ({len(tasks)}):\n\n" + "\n\n".join(lines)
-
-    # ------------------------------------------------------------------
-    # create_scheduled_task
-    # ------------------------------------------------------------------
-    @tool(name="create_scheduled_task", approval_mode="never_require")
-    async def create_scheduled_task(
-        task_name: Annotated[
-            str,
-            "A short snake_case name for the task, e.g. 'weekly_report' or 'happiness_quote'.",
+    @tool(name="manage_scheduled_tasks", approval_mode="never_require")
+    async def manage_scheduled_tasks(
+        op: Annotated[
+            Literal["list", "create", "update", "delete"],
+            "The operation to run: 'list', 'create', 'update' or 'delete'.",
         ],
-        task_prompt: Annotated[
-            str,
-            "The full prompt the cron agent will execute. Write it as a complete "
-            "instruction, e.g. 'Send a Teams message to {manager_email} with an "
-            "inspiring quote about happiness.' "
-            "Supported placeholders (auto-resolved at runtime): "
-            "{manager_email} = the manager's email, "
-            "{agent_upn} = this agent's UPN, "
-            "{timestamp} = current UTC time. "
-            "DO NOT look up emails before calling this tool — just use the "
-            "placeholders and they will be filled in automatically.",
-        ],
-        is_recurrent: Annotated[
-            bool,
-            "True (default) = repeats every cron interval. "
-            "False = runs once then auto-disables.",
-        ] = True,
-    ) -> str:
-        """Create a new scheduled task in PostgreSQL so the background cron job
-        will execute it automatically on the next interval.
-
-        IMPORTANT — call this tool IMMEDIATELY when the user asks you to
-        create, schedule, or register a task. Do NOT call getMyProfile,
-        getUserProfile, or any other tool first. The task_prompt supports
-        {manager_email} and other placeholders that are resolved at execution
-        time, so you never need to look up emails beforehand.
-
-        Examples of when to call this tool:
-        - "Create a task to send me a quote about happiness"
-        - "Schedule a weekly report"
-        - "Add a recurring reminder to check my inbox"
-        """
-        try:
-            from a365_agent.storage import get_storage
-
-            logger.info(f"Creating task '{task_name}' for agent {agent_upn}")
-            storage = await get_storage()
-            row = await storage.create_scheduled_task(
-                agent_user_id=agent_upn,
-                task_name=task_name,
-                task_prompt=task_prompt,
-                is_enabled=True,
-            )
-            task_id = row.get("task_id", "unknown")
-            recurrence = "Repeats every cycle" if is_recurrent else "Runs once"
-            logger.info(f"Task created: {task_name} ({task_id}) for {agent_upn}")
-            return (
-                f"Task created: {task_name}\n"
-                f"ID: {task_id}\n"
-                f"Schedule: {recurrence}\n"
-                f"Status: Enabled\n"
-                f"It will run automatically on the next cron cycle."
-            )
-        except Exception as e:
-            logger.error(f"create_scheduled_task failed: {e}")
-            return f"Error creating task: {e}"
-
-    # ------------------------------------------------------------------
-    # update_scheduled_task
-    # ------------------------------------------------------------------
-    @tool(name="update_scheduled_task", approval_mode="never_require")
-    async def update_scheduled_task(
         task_id: Annotated[
-            str,
-            "The UUID task_id to update. Get it from list_my_scheduled_tasks.",
-        ],
+            Optional[str],
+            "update/delete: the UUID task_id of the task. Get it from op='list'.",
+        ] = None,
+        task_ids: Annotated[
+            Optional[list[str]],
+            "delete: several UUID task_ids to delete at once (instead of task_id).",
+        ] = None,
         task_name: Annotated[
             Optional[str],
-            "New name for the task. Omit or pass null to keep the current name.",
+            "create: a short snake_case name, e.g. 'weekly_report'. "
+            "update: the new name (omit to keep the current one).",
         ] = None,
         task_prompt: Annotated[
             Optional[str],
-            "New prompt for the task. Omit or pass null to keep the current prompt.",
+            "create: the full prompt the cron agent will execute, written as a "
+            "complete instruction, e.g. 'Send a Teams message to {manager_email} "
+            "with an inspiring quote about happiness.' Supported placeholders "
+            "(auto-resolved at runtime): {manager_email} = the manager's email, "
+            "{agent_upn} = this agent's UPN, {timestamp} = current UTC time. "
+            "DO NOT look up emails first - use the placeholders. "
+            "update: the new prompt (omit to keep the current one).",
         ] = None,
         is_enabled: Annotated[
             Optional[bool],
-            "Set true to enable or false to disable the task. "
-            "Omit or pass null to keep the current state.",
+            "update: true to enable or false to disable the task "
+            "(omit to keep the current state).",
         ] = None,
+        is_recurrent: Annotated[
+            bool,
+            "create: true (default) repeats every cron interval, "
+            "false runs once then auto-disables.",
+        ] = True,
+        limit: Annotated[
+            int,
+            f"list: maximum number of tasks to return (oldest first). "
+            f"Default {_DEFAULT_LIST_LIMIT}.",
+        ] = _DEFAULT_LIST_LIMIT,
     ) -> str:
-        """Update an existing scheduled task's name, prompt, or enabled status
-        in PostgreSQL.
-
-        Call this tool when the user wants to:
-        - Rename a task
-        - Change what a task does (update the prompt)
-        - Enable or disable a task without deleting it
-
-        You must provide the task_id. If you don't have it, call
-        list_my_scheduled_tasks first to look it up."""
-        try:
-            from a365_agent.storage import get_storage
-
-            fields = {}
-            if task_name is not None:
-                fields["task_name"] = task_name
-            if task_prompt is not None:
-                fields["task_prompt"] = task_prompt
-            if is_enabled is not None:
-                fields["is_enabled"] = is_enabled
-
-            if not fields:
-                return "No fields provided to update. Specify at least one of: task_name, task_prompt, is_enabled."
-
-            storage = await get_storage()
-            updated = await storage.update_scheduled_task_fields(task_id, **fields)
-            if updated is None:
-                return f"Task {task_id} not found. Use list_my_scheduled_tasks to check your tasks."
-
-            status = "Enabled" if updated.get("is_enabled") else "Disabled"
-            return (
-                f"Task updated: {updated.get('task_name')}\n"
-                f"ID: {task_id}\n"
-                f"Status: {status}\n"
-                f"Changes take effect on the next cron cycle."
-            )
-        except Exception as e:
-            logger.error(f"update_scheduled_task failed: {e}")
-            return f"Error updating task: {e}"
-
-    # ------------------------------------------------------------------
-    # delete_scheduled_task
-    # ------------------------------------------------------------------
-    @tool(name="delete_scheduled_task", approval_mode="never_require")
-    async def delete_scheduled_task(
-        task_id: Annotated[
-            str,
-            "The UUID task_id to delete. Get it from list_my_scheduled_tasks.",
-        ],
-    ) -> str:
-        """Permanently delete a scheduled task from PostgreSQL. This cannot be
-        undone.
-
-        Call this tool when the user asks to remove or delete a specific task.
-        You must provide the task_id. If you don't have it, call
-        list_my_scheduled_tasks first to look it up."""
-        try:
-            from a365_agent.storage import get_storage
-
-            storage = await get_storage()
-            deleted = await storage.delete_scheduled_task(task_id)
-            if not deleted:
-                return f"Task {task_id} not found. Use list_my_scheduled_tasks to check your tasks."
-
-            return f"Task deleted. ID: {task_id}"
-        except Exception as e:
-            logger.error(f"delete_scheduled_task failed: {e}")
-            return f"Error deleting task: {e}"
-
-    return [
-        list_my_scheduled_tasks,
-        create_scheduled_task,
-        update_scheduled_task,
-        delete_scheduled_task,
-    ]
+        """Manage this agent's cron-scheduled tasks stored in PostgreSQL. The
+        background cron job executes enabled tasks on every interval. Only
+        the current agent's tasks are visible.
+
+        op='list' - when the user asks "what tasks do I have?", or to look
+        up a task_id before updating or deleting. Returns JSON
+        {"tasks": [...], "more": bool}; each task has task_id, task_name,
+        task_prompt (first 100 chars), is_enabled, last_run_at and
+        last_status. Only pass limit if you need more than the default.
+
+        op='create' (task_name, task_prompt, is_recurrent) - call
+        IMMEDIATELY when the user asks to create, schedule or register a
+        task; do NOT call getMyProfile, getUserProfile or any other tool
+        first. Returns {"task_id", "task_name", "is_enabled", "recurrent"}.
+
+        op='update' (task_id plus any of task_name, task_prompt,
+        is_enabled) - rename, change the prompt, or enable/disable a task.
+        Returns {"task_id", "task_name", "is_enabled", "changed"}.
+
+        op='delete' (task_id, or task_ids for several) - permanently delete
+        tasks; this cannot be undone. Returns {"deleted": task_id}, or
+        {"deleted": [...], "not_found": [...]} for task_ids.
+
+        Failures return {"error"}."""
+        if op == "list":
+            return await _list_tasks(agent_upn, limit)
+        if op == "create":
+            if not task_name or not task_prompt:
+                return _to_json({"error": "op='create' requires task_name and task_prompt."})
+            return await _create_task(agent_upn, task_name, task_prompt, is_recurrent)
+        if op == "update":
+            if not task_id:
+                return _to_json({"error": "op='update' requires task_id."})
+            return await _update_task(agent_upn, task_id, task_name, task_prompt, is_enabled)
+        if op == "delete":
+            if task_ids:
+                return await _delete_tasks(agent_upn, task_ids)
+            if not task_id:
+                return _to_json({"error": "op='delete' requires task_id or task_ids."})
+            return await _delete_task(agent_upn, task_id)
+        return _to_json({"error": f"Unknown op: {op}. Use list, create, update or delete."})
+
+    return (manage_scheduled_tasks,)
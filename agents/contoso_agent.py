@@ -12,11 +12,13 @@ import aiohttp
 import json
 import logging
 import os
+import time
 from pathlib import Path
 from typing import Optional
 
 from a365_agent.auth import LocalAuthOptions
 from a365_agent.base import AgentBase
+from a365_agent.chat import get_chat_client
 from a365_agent.config import get_settings, AzureOpenAIModelConfig
 from a365_agent.mcp import MCPService
 from a365_agent.observability import enable_agentframework_instrumentation
@@ -24,11 +26,65 @@ from a365_agent.storage import get_storage
 from a365_agent.tools import create_task_tools
 
 from agent_framework import ChatAgent, ChatMessage, AgentThread, ChatMessageStore
-from agent_framework.azure import AzureOpenAIChatClient
 from microsoft_agents.hosting.core import Authorization, TurnContext
 
 logger = logging.getLogger(__name__)
 
+# Attributes probed (in order) for an agent result's text
+_RESULT_TEXT_ATTRS = ("contents", "text", "content")
+
+# Result type -> the first of _RESULT_TEXT_ATTRS it has (None: use str()),
+# so each result class is probed once rather than on every turn
+_result_text_attr: dict[type, Optional[str]] = {}
+
+_MISSING = object()
+
+# Error text that identifies Azure OpenAI throttling (HTTP 429)
+_RATE_LIMIT_MARKERS = ("429", "rate limit", "too many requests")
+
+# Reply used when the model returns no text
+_NO_RESPONSE_TEXT = "I couldn't process your request."
+
+
+class _TurnStream:
+    """
+    A turn's streaming response plus whether any text has reached it yet.
+    
+    Once text has been streamed, errors have to be reported through the
+    same stream (a separate message would land next to a half-written one),
+    and the stream must be ended whatever happens.
+    """
+    
+    __slots__ = ("_stream", "started")
+    
+    def __init__(self, stream) -> None:
+        self._stream = stream
+        self.started = False
+    
+    def queue(self, text: str) -> None:
+        """Queue a chunk of reply text."""
+        self._stream.queue_text_chunk(text)
+        self.started = True
+    
+    def reply(self, text: str) -> str:
+        """
+        Deliver a final (error) reply: appended to the stream if it already
+        has text, otherwise returned for the host to send as usual.
+        """
+        if not self.started:
+            return text
+        self.queue(f"\n\n{text}")
+        return ""
+    
+    async def end(self) -> None:
+        """End the stream if anything was streamed (best effort)."""
+        if not self.started:
+            return
+        try:
+            await self._stream.end_stream()
+        except Exception as e:
+            logger.warning("⚠️ Failed to end streaming response: %s", e)
+
 
 def _load_system_prompt(is_dev_mode: bool = False) -> str:
     """
@@ -113,6 +169,19 @@ class ContosoAgent(AgentBase):
 
     # Feature flag: set PG_ENABLED=true to enable PostgreSQL init gate + history
     PG_ENABLED = os.environ.get("PG_ENABLED", "false").lower() == "true"
+
+    # Prompt-cache warmup: Azure OpenAI evicts cached prompt prefixes after
+    # ~5-10 idle minutes, so between turns a tiny tool-less request re-sends
+    # the (unchanged) instructions + tool prefix. Pings stop once the agent
+    # has been idle for CACHE_WARMUP_MAX_IDLE. Each ping is a billed request,
+    # so this is opt-in: set AZURE_OPENAI_CACHE_WARMUP=true to enable it.
+    CACHE_WARMUP_ENABLED = os.environ.get("AZURE_OPENAI_CACHE_WARMUP", "false").lower() == "true"
+    CACHE_WARMUP_INTERVAL = 240  # seconds
+    CACHE_WARMUP_MAX_IDLE = 1800  # seconds
+
+    # Stream chat replies to the channel as they are generated (when the
+    # turn exposes a streaming response); STREAM_RESPONSES=false disables
+    STREAMING_ENABLED = os.environ.get("STREAM_RESPONSES", "true").lower() == "true"
     
     def __init__(self):
         """Initialize the Contoso Agent."""
@@ -164,10 +233,15 @@ class ContosoAgent(AgentBase):
         
         # Conversation history threads keyed by conversation_id
         self._threads: dict[str, AgentThread] = {}
+        
+        # Prompt-cache warmup (see CACHE_WARMUP_*); last real LLM call, monotonic
+        self._last_llm_call = 0.0
+        self._cache_warmup_task: Optional[asyncio.Task] = None
+        self._cache_warmup_warned = False
     
     def _create_chat_client(self, model_config: Optional[AzureOpenAIModelConfig] = None) -> None:
         """
-        Create the Azure OpenAI chat client with retry configuration.
+        Select the model and its (shared) Azure OpenAI chat client.
         
         Args:
             model_config: Optional specific model to use. If None, uses model pool.
@@ -189,13 +263,7 @@ class ContosoAgent(AgentBase):
                 api_version=settings.api_version,
             )
         
-        # Create the chat client with API key authentication
-        self.chat_client = AzureOpenAIChatClient(
-            endpoint=self.current_model.endpoint,
-            api_key=self.current_model.api_key,
-            deployment_name=self.current_model.deployment,
-            api_version=self.current_model.api_version,
-        )
+        self.chat_client = get_chat_client(self.current_model)
         logger.info(f"🤖 Using model: {self.current_model.name}")
     
     def _create_agent(self) -> None:
@@ -209,15 +277,45 @@ class ContosoAgent(AgentBase):
     
     async def initialize(self) -> None:
         """Initialize the agent (called at startup)."""
+        # Server registration needs the first request's user token; everything
+        # before it is done now so that request only pays for the handshakes
+        self.mcp_service.warm_up()
+
         if self.PG_ENABLED:
             try:
-                from a365_agent.storage import get_storage
                 await get_storage()
                 logger.info("ContosoAgent initialized (PG pool ready)")
             except Exception as e:
                 logger.warning(f"PG pool pre-init failed (will retry on first use): {e}")
         else:
             logger.info("ContosoAgent initialized (PG disabled)")
+
+        if self.CACHE_WARMUP_ENABLED and self._cache_warmup_task is None:
+            self._cache_warmup_task = asyncio.create_task(self._keep_prompt_cache_warm())
+
+    async def _keep_prompt_cache_warm(self) -> None:
+        """Ping the model between turns so the prompt prefix stays cached."""
+        while True:
+            await asyncio.sleep(self.CACHE_WARMUP_INTERVAL)
+            if not self._last_llm_call:
+                continue  # Nothing cached yet
+            idle = time.monotonic() - self._last_llm_call
+            if idle < self.CACHE_WARMUP_INTERVAL or idle > self.CACHE_WARMUP_MAX_IDLE:
+                continue
+            try:
+                # Straight to the chat client: the instructions prefix is sent
+                # but the ping never touches the agent's thread or tools
+                await self.chat_client.get_response([
+                    ChatMessage(role="system", text=self.AGENT_INSTRUCTIONS),
+                    ChatMessage(role="user", text="ping"),
+                ])
+                logger.debug("🔥 Prompt cache warmup ping sent (idle %.0fs)", idle)
+            except Exception as e:
+                if not self._cache_warmup_warned:
+                    self._cache_warmup_warned = True
+                    logger.warning("⚠️ Prompt cache warmup ping failed: %s", e)
+                else:
+                    logger.debug("Prompt cache warmup ping failed: %s", e)
     
     async def _ensure_mcp_initialized(
         self,
@@ -231,7 +329,8 @@ class ContosoAgent(AgentBase):
         
         logger.info("🔧 Initializing MCP servers...")
         
-        # Try bearer token first (dev mode), then agentic auth (production)
+        # Try bearer token first (dev mode), then agentic auth (production).
+        # Turns racing here share one initialization and all get its agent
         if self.auth_options.bearer_token:
             self.agent = await self.mcp_service.initialize_with_bearer_token(
                 chat_client=self.chat_client,
@@ -240,7 +339,7 @@ class ContosoAgent(AgentBase):
                 auth=auth,
                 auth_handler_name=auth_handler_name,
                 turn_context=context,
-            ) or self.agent
+            )
         else:
             self.agent = await self.mcp_service.initialize_with_agentic_auth(
                 chat_client=self.chat_client,
@@ -248,7 +347,7 @@ class ContosoAgent(AgentBase):
                 auth=auth,
                 auth_handler_name=auth_handler_name,
                 turn_context=context,
-            ) or self.agent
+            )
         
         self.mcp_servers_initialized = True
         self._task_tools_registered = False  # New agent from MCP SDK, task tools need re-registration
@@ -266,16 +365,33 @@ class ContosoAgent(AgentBase):
         """Extract text content from agent result."""
         if not result:
             return ""
-        if hasattr(result, "contents"):
-            return str(result.contents)
-        elif hasattr(result, "text"):
-            return str(result.text)
-        elif hasattr(result, "content"):
-            return str(result.content)
+        cls = type(result)
+        try:
+            attr = _result_text_attr[cls]
+        except KeyError:
+            attr = next((a for a in _RESULT_TEXT_ATTRS if hasattr(result, a)), None)
+            _result_text_attr[cls] = attr
+        if attr is not None:
+            value = getattr(result, attr, _MISSING)
+            if value is not _MISSING:
+                return str(value)
         return str(result)
 
+    def _get_stream(self, context: TurnContext) -> Optional[_TurnStream]:
+        """The turn's streaming response, or None if streaming isn't available."""
+        if not self.STREAMING_ENABLED:
+            return None
+        stream = getattr(context, "streaming_response", None)
+        if stream is None or not hasattr(stream, "queue_text_chunk") or not hasattr(stream, "end_stream"):
+            return None
+        return _TurnStream(stream)
+
     async def _run_with_failover(
-        self, message: str, max_retries: int = 3, thread: "AgentThread | None" = None
+        self,
+        message: str,
+        max_retries: int = 3,
+        thread: "AgentThread | None" = None,
+        stream: Optional[_TurnStream] = None,
     ) -> str:
         """
         Run agent with automatic failover to other models on rate limiting (429).
@@ -284,6 +400,8 @@ class ContosoAgent(AgentBase):
             message: The message to process
             max_retries: Maximum number of failover attempts
             thread: Optional AgentThread with conversation history
+            stream: Optional streaming response (see ``_get_stream``); text is
+                    queued on it as it is generated. The caller ends the stream.
             
         Returns:
             The agent's response
@@ -291,21 +409,39 @@ class ContosoAgent(AgentBase):
         last_error = None
         
         for attempt in range(max_retries):
+            chunks: list[str] = []
             try:
                 logger.info(f"🤖 Calling agent.run() (attempt {attempt + 1}/{max_retries})...")
-                result = await self.agent.run(message, thread=thread)
+                if stream is None:
+                    result = await self.agent.run(message, thread=thread)
+                    response = self._extract_result(result)
+                else:
+                    async for update in self.agent.run_stream(message, thread=thread):
+                        text = getattr(update, "text", None)
+                        if text:
+                            chunks.append(text)
+                            stream.queue(text)
+                    response = "".join(chunks)
+                    if not response:
+                        stream.queue(_NO_RESPONSE_TEXT)
+                self._last_llm_call = time.monotonic()
                 logger.info("✅ Agent response received")
                 
                 # Success - clear any throttle on current model
                 if self.settings.model_pool and self.current_model:
                     self.settings.model_pool.clear_throttle(self.current_model)
                 
-                return self._extract_result(result) or "I couldn't process your request."
+                return response or _NO_RESPONSE_TEXT
                 
             except Exception as e:
                 error_str = str(e).lower()
                 last_error = e
                 
+                # Part of the answer already reached the user; a retry
+                # would send it again
+                if chunks:
+                    raise
+                
                 # Check if it's a rate limiting error (429)
                 is_rate_limit = (
                     "429" in error_str or 
@@ -364,7 +500,7 @@ class ContosoAgent(AgentBase):
         # added tools while _task_tools_registered remains True.
         if self._task_tools_registered:
             existing = self.agent.default_options.get("tools", [])
-            task_tool_names = {"list_my_scheduled_tasks", "create_scheduled_task", "update_scheduled_task", "delete_scheduled_task"}
+            task_tool_names = {"manage_scheduled_tasks"}
             has_task_tools = any(
                 getattr(t, "name", None) in task_tool_names
                 or (hasattr(t, "__name__") and t.__name__ in task_tool_names)
@@ -426,18 +562,20 @@ class ContosoAgent(AgentBase):
         try:
             storage = await get_storage()
             agent_id = self._agent_user_id or ""
-            await storage.save_message(
-                conversation_id=conversation_id,
-                agent_id=agent_id,
-                role="user",
-                content=user_message[:4000],
-            )
-            await storage.save_message(
-                conversation_id=conversation_id,
-                agent_id=agent_id,
-                role="assistant",
-                content=assistant_response[:4000],
-            )
+            await storage.save_messages([
+                {
+                    "conversation_id": conversation_id,
+                    "agent_id": agent_id,
+                    "role": "user",
+                    "content": user_message[:4000],
+                },
+                {
+                    "conversation_id": conversation_id,
+                    "agent_id": agent_id,
+                    "role": "assistant",
+                    "content": assistant_response[:4000],
+                },
+            ])
         except Exception as e:
             logger.warning(f"⚠️ Failed to persist conversation exchange: {e}")
 
@@ -539,11 +677,12 @@ class ContosoAgent(AgentBase):
                 "Please try again or contact an administrator."
             )
 
-        # First time — ensure MCP is ready (needed for Teams notification later)
-        await self._ensure_mcp_initialized(auth, auth_handler_name, context)
-
-        # Get agent UPN from Graph
-        profile = await self._graph_request("GET", "/me", graph_token)
+        # First time — MCP (needed for Teams notification later) and the
+        # agent UPN lookup are independent, so their handshakes overlap
+        _, profile = await asyncio.gather(
+            self._ensure_mcp_initialized(auth, auth_handler_name, context),
+            self._graph_request("GET", "/me", graph_token),
+        )
         if not profile or not profile.get("userPrincipalName"):
             return False, (
                 "Hi! I couldn't retrieve my profile. "
@@ -808,10 +947,17 @@ class ContosoAgent(AgentBase):
         When PG_ENABLED=false (default): straight-through MCP + LLM, with
         in-memory conversation history but no database init-gate or task tools.
         When PG_ENABLED=true: full init gate, PG-backed history, and task tools.
+
+        When the reply is streamed, errors after the first chunk are appended
+        to the stream and an empty string is returned; the stream is always
+        ended before returning.
         """
+        stream = self._get_stream(context)
         try:
             if self.PG_ENABLED:
-                return await self._process_with_pg(message, auth, auth_handler_name, context)
+                return await self._process_with_pg(
+                    message, auth, auth_handler_name, context, stream
+                )
 
             # ----- lightweight path (no PostgreSQL) -----------------------
             await self._ensure_mcp_initialized(auth, auth_handler_name, context)
@@ -827,26 +973,45 @@ class ContosoAgent(AgentBase):
                 self._threads[conv_id] = thread
 
             async with asyncio.timeout(self.PROCESSING_TIMEOUT):
-                response = await self._run_with_failover(message, thread=thread)
+                response = await self._run_with_failover(message, thread=thread, stream=stream)
 
+            if stream is not None:
+                return ""  # Already delivered through the stream
             return response
 
         except asyncio.TimeoutError:
             logger.error(f"Processing timeout after {self.PROCESSING_TIMEOUT}s")
             await self._reset_mcp_after_error()
-            return "Sorry, the request took too long. Please try again."
+            return self._error_reply(stream, "Sorry, the request took too long. Please try again.")
         except Exception as e:
             error_str = str(e).lower()
             logger.error(f"Error processing message: {e}")
-            await self._reset_mcp_after_error()
 
+            # The model rejected or throttled the request; the MCP sessions are
+            # healthy, so keep them instead of re-registering every server
             if "content_filter" in error_str or "responsibleaipolicyviolation" in error_str:
-                return (
+                return self._error_reply(
+                    stream,
                     "Sorry, the AI service's content filter flagged this request. "
-                    "Please try rephrasing your message."
+                    "Please try rephrasing your message.",
+                )
+            if any(marker in error_str for marker in _RATE_LIMIT_MARKERS):
+                return self._error_reply(
+                    stream, "Sorry, the AI service is busy right now. Please try again in a moment."
                 )
 
-            return "Sorry, I encountered an error processing your request. Please try again."
+            await self._reset_mcp_after_error()
+            return self._error_reply(
+                stream, "Sorry, I encountered an error processing your request. Please try again."
+            )
+        finally:
+            if stream is not None:
+                await stream.end()
+
+    @staticmethod
+    def _error_reply(stream: Optional[_TurnStream], text: str) -> str:
+        """Error text for the host to send, or "" once it went into the stream."""
+        return stream.reply(text) if stream is not None else text
 
     async def _process_with_pg(
         self,
@@ -854,10 +1019,11 @@ class ContosoAgent(AgentBase):
         auth: Authorization,
         auth_handler_name: Optional[str],
         context: TurnContext,
+        stream: Optional[_TurnStream] = None,
     ) -> str:
         """Full processing path with PostgreSQL init gate + conversation history.
 
-        Only called when PG_ENABLED=true.
+        Only called when PG_ENABLED=true. ``stream`` is ended by the caller.
         """
         # Init gate (also initialises MCP on first call)
         gate_passed, gate_message = await self._ensure_init_gate(
@@ -895,10 +1061,14 @@ class ContosoAgent(AgentBase):
         thread = await self._get_or_create_thread(conv_id)
 
         async with asyncio.timeout(self.PROCESSING_TIMEOUT):
-            response = await self._run_with_failover(augmented_message, thread=thread)
+            response = await self._run_with_failover(
+                augmented_message, thread=thread, stream=stream
+            )
 
+        # Only complete exchanges reach here; a failed or timed-out (possibly
+        # partially streamed) reply raises above and isn't saved
         await self._save_exchange_to_pg(conv_id, message, response)
-        return response
+        return "" if stream is not None else response
     
     # =========================================================================
     # NOTIFICATION HANDLERS
@@ -926,12 +1096,13 @@ class ContosoAgent(AgentBase):
         html_body = ""
         entities = getattr(context.activity, "entities", []) or []
         for entity in entities:
-            entity_type = getattr(entity, "type", "") if hasattr(entity, "type") else entity.get("type", "")
-            if entity_type == "emailNotification":
-                if hasattr(entity, "htmlBody"):
-                    html_body = entity.htmlBody or ""
-                elif isinstance(entity, dict):
-                    html_body = entity.get("htmlBody", "") or ""
+            # One lookup per field; entities arrive as objects or plain dicts
+            if isinstance(entity, dict):
+                if entity.get("type") == "emailNotification":
+                    html_body = entity.get("htmlBody") or ""
+                    break
+            elif getattr(entity, "type", "") == "emailNotification":
+                html_body = getattr(entity, "htmlBody", None) or ""
                 break
         html_lower = html_body.lower()
 
@@ -1012,17 +1183,21 @@ class ContosoAgent(AgentBase):
         try:
             logger.info("📧 Processing user email notification")
 
-            # Initialize MCP for full tool access (mail reply, Teams, etc.)
-            await self._ensure_mcp_initialized(auth, auth_handler_name, context)
-
             if self.PG_ENABLED:
-                gate_passed, gate_message = await self._ensure_init_gate(
-                    auth, auth_handler_name, context
+                # MCP startup (mail reply, Teams, etc.) doesn't depend on the
+                # init gate's Graph token exchange and registry lookup, so the
+                # two run concurrently instead of back to back
+                _, (gate_passed, gate_message) = await asyncio.gather(
+                    self._ensure_mcp_initialized(auth, auth_handler_name, context),
+                    self._ensure_init_gate(auth, auth_handler_name, context),
                 )
                 if not gate_passed:
                     logger.info(f"📧 Init gate blocked email processing: {gate_message[:80]}")
                     return ""
                 self._ensure_task_tools()
+            else:
+                # Initialize MCP for full tool access (mail reply, Teams, etc.)
+                await self._ensure_mcp_initialized(auth, auth_handler_name, context)
 
             # Extract email details
             email_text = getattr(context.activity, "text", "") or ""
@@ -1297,6 +1472,9 @@ Respond appropriately:"""
     async def cleanup(self) -> None:
         """Clean up agent resources."""
         try:
+            if self._cache_warmup_task:
+                self._cache_warmup_task.cancel()
+                self._cache_warmup_task = None
             await self.mcp_service.cleanup()
             # Close Graph HTTP session
             if self._graph_session and not self._graph_session.closed:
@@ -0,0 +1,134 @@
+# Copyright (c) Microsoft. All rights reserved.
+
+"""Tests for PostgresStorage's batched scheduled-task writes (no database needed)."""
+
+import asyncio
+
+import pytest
+
+pytest.importorskip("asyncpg")
+
+from a365_agent.storage.pg_storage import PostgresStorage  # noqa: E402
+
+
+class _FakeTransaction:
+    """Outermost transaction commits into the pool; nested ones act as savepoints."""
+
+    def __init__(self, conn: "_FakeConnection") -> None:
+        self._conn = conn
+
+    async def __aenter__(self) -> None:
+        self._conn.pending.append([])
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        statements = self._conn.pending.pop()
+        if exc_type is None:
+            if self._conn.pending:
+                self._conn.pending[-1].extend(statements)
+            else:
+                self._conn.pool.commits.append(statements)
+        return False
+
+
+class _FakeConnection:
+    def __init__(self, pool: "_FakePool") -> None:
+        self.pool = pool
+        self.pending: list[list[tuple]] = []
+
+    def transaction(self) -> _FakeTransaction:
+        return _FakeTransaction(self)
+
+    async def execute(self, sql: str, *args):
+        if self.pool.gate is not None:
+            await self.pool.gate.wait()
+        if sql == "FAIL":
+            raise ValueError("boom")
+        self.pending[-1].append((sql, args))
+        return "UPDATE 1"
+
+
+class _FakePool:
+    def __init__(self) -> None:
+        self.commits: list[list[tuple]] = []
+        self.gate: asyncio.Event | None = None
+        self.closed = False
+
+    def acquire(self) -> "_FakePool":
+        return self
+
+    async def __aenter__(self) -> _FakeConnection:
+        return _FakeConnection(self)
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+def _storage() -> tuple[PostgresStorage, _FakePool]:
+    storage = PostgresStorage(dsn="postgresql://test")
+    pool = _FakePool()
+    storage._pool = pool
+    return storage, pool
+
+
+@pytest.mark.asyncio
+async def test_concurrent_task_ops_share_one_commit():
+    storage, pool = _storage()
+
+    results = await asyncio.gather(
+        *(storage._apply_task_op("UPDATE", "execute", i) for i in range(3))
+    )
+
+    assert results == ["UPDATE 1"] * 3
+    assert pool.commits == [[("UPDATE", (0,)), ("UPDATE", (1,)), ("UPDATE", (2,))]]
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_failing_task_op_only_rolls_back_its_savepoint():
+    storage, pool = _storage()
+
+    results = await asyncio.gather(
+        storage._apply_task_op("UPDATE", "execute", 1),
+        storage._apply_task_op("FAIL", "execute"),
+        storage._apply_task_op("UPDATE", "execute", 2),
+        return_exceptions=True,
+    )
+
+    assert results[0] == "UPDATE 1" and results[2] == "UPDATE 1"
+    assert isinstance(results[1], ValueError)
+    assert pool.commits == [[("UPDATE", (1,)), ("UPDATE", (2,))]]
+    await storage.close()
+
+
+@pytest.mark.asyncio
+async def test_close_commits_queued_task_ops_before_stopping():
+    storage, pool = _storage()
+    pool.gate = asyncio.Event()
+
+    ops = [
+        asyncio.create_task(storage._apply_task_op("UPDATE", "execute", i))
+        for i in range(3)
+    ]
+    # A background write waiting on a task op must not hang close()
+    storage.submit_write(storage._apply_task_op("UPDATE", "execute", 3), label="test")
+    # Let the worker pick the batch up and block mid-transaction
+    await asyncio.sleep(0.02)
+
+    closing = asyncio.create_task(storage.close())
+    await asyncio.sleep(0.05)
+    assert not closing.done()
+    pool.gate.set()
+    await asyncio.wait_for(closing, timeout=1)
+
+    assert [await op for op in ops] == ["UPDATE 1"] * 3
+    assert sorted(args for batch in pool.commits for _, args in batch) == [
+        (0,), (1,), (2,), (3,)
+    ]
+    assert pool.closed
+    assert storage._task_op_worker is None
+
+    with pytest.raises(ConnectionError):
+        await storage._apply_task_op("UPDATE", "execute", 4)